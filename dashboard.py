@@ -1,17 +1,24 @@
 from __future__ import annotations
 
-import re
+import logging
+import os
 import sqlite3
+import threading
 from datetime import datetime
 from datetime import date, timedelta
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import pyarrow as pa
 import streamlit as st
 
 from db_monitor.config import load_settings
 
+logger = logging.getLogger(__name__)
+
 
 ROUTE_ORDER = [
     "Morning Freiburg->Offenburg",
@@ -28,57 +35,146 @@ COMMUTE_TARGET_TIME = {
     "Afternoon Offenburg->Freiburg": "16:30",
 }
 
+MATRIX_DAYS = 30
+# Long train histories are thinned out before plotting to keep the figure payload small.
+HISTORY_MAX_POINTS = 400
+HISTORY_WEBGL_POINTS = 200
+
 CAR_ROUTE_BY_TRAIN_ROUTE = {
     "Morning Freiburg->Offenburg": "Car Morning Freiburg->Offenburg",
     "Afternoon Offenburg->Freiburg": "Car Afternoon Offenburg->Freiburg",
 }
 
 
-def load_data(db_path: str, timezone: str) -> pd.DataFrame:
-    with sqlite3.connect(db_path) as con:
-        cols = {row[1] for row in con.execute("PRAGMA table_info(observations)").fetchall()}
-        if not cols:
-            return pd.DataFrame()
-
-        train_name_expr = "train_name" if "train_name" in cols else "line"
-        arrival_delay_expr = "arrival_delay_minutes" if "arrival_delay_minutes" in cols else "0"
-        arrival_observed_expr = "arrival_observed" if "arrival_observed" in cols else "1"
-        arrival_missing_expr = "arrival_info_missing" if "arrival_info_missing" in cols else "0"
-        dep_reason_expr = "departure_reason" if "departure_reason" in cols else "''"
-        arr_reason_expr = "arrival_reason" if "arrival_reason" in cols else "''"
-        try:
-            df = pd.read_sql_query(
-                f"""
-                SELECT
-                    service_date,
-                    train_id,
-                    {train_name_expr} AS train_name,
-                    line,
-                    route_label,
-                    observation_ts,
-                    planned_departure,
-                    planned_arrival,
-                    actual_arrival,
-                    delay_minutes,
-                    {arrival_delay_expr} AS arrival_delay_minutes,
-                    {arrival_observed_expr} AS arrival_observed,
-                    {arrival_missing_expr} AS arrival_info_missing,
-                    {dep_reason_expr} AS departure_reason,
-                    {arr_reason_expr} AS arrival_reason,
-                    canceled
-                FROM observations
-                ORDER BY service_date DESC, route_label, planned_departure
-                """,
-                con,
-                parse_dates=["observation_ts", "planned_departure", "planned_arrival", "actual_arrival"],
-            )
-        except Exception:
-            return pd.DataFrame()
+def _db_version(db_path: str) -> tuple[float, float, int]:
+    # Commits land in the -wal file until a checkpoint, leaving the main file's mtime untouched,
+    # so a non-empty WAL is part of the version. An empty WAL (just created by a reader or
+    # truncated by a checkpoint) adds nothing the main file's mtime does not already reflect.
+    try:
+        db_mtime = os.path.getmtime(db_path)
+    except OSError:
+        return 0.0, 0.0, 0
+    try:
+        wal = os.stat(f"{db_path}-wal")
+    except OSError:
+        return db_mtime, 0.0, 0
+    if wal.st_size == 0:
+        return db_mtime, 0.0, 0
+    return db_mtime, wal.st_mtime, wal.st_size
+
+
+def _frame_token(df: pd.DataFrame) -> tuple[int, object]:
+    # Cheap cache key for derived frames; hashing the full frame costs as much as rebuilding it.
+    if df.empty:
+        return 0, None
+    return len(df), df["observation_ts"].max()
+
+
+_CONNECTION_LOCK = threading.Lock()
+
+
+# Shared read-only handle across reruns and sessions. Keyed on the file version so a database
+# replaced on disk (e.g. by a git pull) gets a fresh connection instead of the unlinked file.
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _get_connection(db_path: str, db_version: tuple[float, float, int] = (0.0, 0.0, 0)) -> sqlite3.Connection:
+    con = sqlite3.connect(db_path, check_same_thread=False)
+    con.execute("PRAGMA mmap_size=268435456")
+    con.execute("PRAGMA cache_size=-65536")
+    con.execute("PRAGMA temp_store=MEMORY")
+    return con
+
+
+def _table_columns(db_path: str, db_version: tuple[float, float, int], table: str) -> set[str]:
+    with _CONNECTION_LOCK:
+        con = _get_connection(db_path, db_version)
+        return {row[1] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _read_sql_frame(db_path: str, db_version: tuple[float, float, int], sql: str) -> pd.DataFrame:
+    with _CONNECTION_LOCK:
+        return pd.read_sql_query(sql, _get_connection(db_path, db_version))
+
+
+def _parse_datetime_columns(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    # Same conversion pd.read_sql_query(parse_dates=...) applies.
+    for col in columns:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def _read_persisted_frame(cache_path: str, db_version: tuple[float, float, int]) -> pd.DataFrame | None:
+    try:
+        if Path(f"{cache_path}.version").read_text() != repr(db_version):
+            return None
+        return pd.read_parquet(cache_path)
+    except FileNotFoundError:
+        # Nothing persisted yet.
+        return None
+    except (OSError, ValueError, pa.ArrowException) as exc:
+        logger.warning("Ignoring unreadable dashboard cache %s: %s", cache_path, exc)
+        return None
+
+
+def _persist_frame(cache_path: str, db_version: tuple[float, float, int], df: pd.DataFrame) -> None:
+    # Best effort: the checkout may be read-only. Replace atomically so readers never see partial files.
+    try:
+        tmp_path = f"{cache_path}.tmp"
+        df.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, cache_path)
+        Path(f"{cache_path}.version").write_text(repr(db_version))
+    except (OSError, ValueError, pa.ArrowException) as exc:
+        logger.warning("Could not write dashboard cache %s: %s", cache_path, exc)
+
+
+def _load_observation_frame(
+    db_path: str,
+    db_version: tuple[float, float, int],
+) -> pd.DataFrame:
+    cols = _table_columns(db_path, db_version, "observations")
+    if not cols:
+        return pd.DataFrame()
+
+    train_name_expr = "train_name" if "train_name" in cols else "line"
+    arrival_delay_expr = "arrival_delay_minutes" if "arrival_delay_minutes" in cols else "0"
+    arrival_observed_expr = "arrival_observed" if "arrival_observed" in cols else "1"
+    arrival_missing_expr = "arrival_info_missing" if "arrival_info_missing" in cols else "0"
+    dep_reason_expr = "departure_reason" if "departure_reason" in cols else "''"
+    arr_reason_expr = "arrival_reason" if "arrival_reason" in cols else "''"
+    try:
+        df = _read_sql_frame(
+            db_path,
+            db_version,
+            f"""
+            SELECT
+                service_date,
+                train_id,
+                {train_name_expr} AS train_name,
+                line,
+                route_label,
+                observation_ts,
+                planned_departure,
+                planned_arrival,
+                actual_arrival,
+                delay_minutes,
+                {arrival_delay_expr} AS arrival_delay_minutes,
+                {arrival_observed_expr} AS arrival_observed,
+                {arrival_missing_expr} AS arrival_info_missing,
+                {dep_reason_expr} AS departure_reason,
+                {arr_reason_expr} AS arrival_reason,
+                canceled
+            FROM observations
+            ORDER BY service_date DESC, route_label, planned_departure
+            """,
+        )
+    except Exception:
+        return pd.DataFrame()
 
     if df.empty:
         return df
 
-    df["service_date"] = pd.to_datetime(df["service_date"]).dt.date
+    df = _parse_datetime_columns(df, ["observation_ts", "planned_departure", "planned_arrival", "actual_arrival"])
+    # Kept as datetime64 so date filters and comparisons stay vectorized.
+    df["service_date"] = pd.to_datetime(df["service_date"])
     df["canceled"] = df["canceled"].astype(bool)
     df["arrival_observed"] = df["arrival_observed"].astype(bool)
     df["arrival_info_missing"] = df["arrival_info_missing"].astype(bool)
@@ -87,18 +183,46 @@ def load_data(db_path: str, timezone: str) -> pd.DataFrame:
     df["departure_reason"] = df["departure_reason"].fillna("")
     df["arrival_reason"] = df["arrival_reason"].fillna("")
     df["departure_hhmm"] = df["planned_departure"].dt.strftime("%H:%M")
-    df["zug"] = df.apply(
-        lambda r: f"{(r['train_name'] or r['line'] or 'Unbekannt')} | {r['departure_hhmm']}",
-        axis=1,
-    )
+    zug_name = df["train_name"].where(df["train_name"] != "", df["line"])
+    zug_name = zug_name.where(zug_name != "", "Unbekannt")
+    df["zug"] = zug_name + " | " + df["departure_hhmm"]
+
+    # Few distinct values per column: categoricals group and filter on integer codes.
+    for col in ("zug", "route_label", "departure_reason", "arrival_reason"):
+        df[col] = df[col].astype("category")
+    return df
+
+
+# `db_version` is part of the cache key so a new collection run invalidates the cached frame.
+@st.cache_data(ttl=60, show_spinner=False)
+def load_data(
+    db_path: str,
+    timezone: str,
+    db_version: tuple[float, float, int] = (0.0, 0.0, 0),
+) -> pd.DataFrame:
+    # The full frame is also kept as parquet next to the database, so a restarted
+    # app skips SQL and parsing until the next collection run changes the file.
+    persist = db_version[0] > 0
+    cache_path = f"{db_path}.cache.parquet"
+    df = _read_persisted_frame(cache_path, db_version) if persist else None
+    if df is None:
+        df = _load_observation_frame(db_path, db_version)
+        # Object-dtype timestamps (mixed UTC offsets) would come back coerced, so those stay uncached.
+        if persist and not df.empty and pd.api.types.is_datetime64_any_dtype(df["observation_ts"]):
+            _persist_frame(cache_path, db_version, df)
+    if df.empty:
+        return df
 
     now_local = datetime.now(ZoneInfo(timezone)).replace(tzinfo=None)
-    deadline = df["planned_arrival"] + pd.to_timedelta(1, unit="h")
     today_local = now_local.date()
-    inferred_missing = (~df["arrival_observed"]) & (df["planned_arrival"].notna()) & (deadline < now_local)
-    inferred_missing_past = (~df["arrival_observed"]) & (df["service_date"] < today_local)
-    df["effective_arrival_missing"] = df["arrival_info_missing"] | inferred_missing | inferred_missing_past
-    df["effective_arrival_open"] = (~df["arrival_observed"]) & (~df["effective_arrival_missing"])
+    # Plain numpy arrays avoid a temporary Series per term; NaT arrivals never count as overdue.
+    not_observed = ~df["arrival_observed"].to_numpy()
+    planned_arrival = df["planned_arrival"].to_numpy(dtype="datetime64[ns]")
+    overdue = planned_arrival + np.timedelta64(1, "h") < np.datetime64(now_local)
+    past_day = df["service_date"].to_numpy() < np.datetime64(today_local)
+    arrival_missing = df["arrival_info_missing"].to_numpy() | (not_observed & (overdue | past_day))
+    df["effective_arrival_missing"] = arrival_missing
+    df["effective_arrival_open"] = not_observed & ~arrival_missing
 
     # Departure can be falsely shown as 0 before scheduled departure time.
     # Mark these as unknown in the UI.
@@ -121,32 +245,38 @@ def load_data(db_path: str, timezone: str) -> pd.DataFrame:
     df.loc[suspicious_prearrival_zero, "effective_arrival_missing"] = False
     df.loc[suspicious_prearrival_zero, "effective_arrival_open"] = True
 
+    # Delays are small whole minutes; narrow dtypes keep the matrix aggregations cheap.
+    df["delay_minutes"] = df["delay_minutes"].astype("Int16")
+    df["arrival_delay_minutes"] = df["arrival_delay_minutes"].astype("Int16")
     return df
 
 
-def load_car_data(db_path: str) -> pd.DataFrame:
-    with sqlite3.connect(db_path) as con:
-        cols = {row[1] for row in con.execute("PRAGMA table_info(car_observations)").fetchall()}
-        if not cols:
-            return pd.DataFrame()
-        df = pd.read_sql_query(
-            """
-            SELECT
-                service_date,
-                route_label,
-                observation_ts,
-                target_departure_time,
-                duration_minutes,
-                distance_km
-            FROM car_observations
-            ORDER BY service_date DESC, route_label
-            """,
-            con,
-            parse_dates=["observation_ts"],
-        )
+@st.cache_data(ttl=60, show_spinner=False)
+def load_car_data(db_path: str, db_version: tuple[float, float, int] = (0.0, 0.0, 0)) -> pd.DataFrame:
+    cols = _table_columns(db_path, db_version, "car_observations")
+    if not cols:
+        return pd.DataFrame()
+    df = _read_sql_frame(
+        db_path,
+        db_version,
+        """
+        SELECT
+            service_date,
+            route_label,
+            observation_ts,
+            target_departure_time,
+            duration_minutes,
+            distance_km
+        FROM car_observations
+        ORDER BY service_date DESC, route_label
+        """,
+    )
     if df.empty:
         return df
+    df = _parse_datetime_columns(df, ["observation_ts"])
     df["service_date"] = pd.to_datetime(df["service_date"]).dt.date
+    df["duration_minutes"] = df["duration_minutes"].astype("Int16")
+    df["distance_km"] = df["distance_km"].astype("float32")
     return df
 
 
@@ -156,7 +286,7 @@ def _build_car_commute_series(car_df: pd.DataFrame) -> pd.DataFrame:
         tmp = car_df[car_df["route_label"] == car_route].copy()
         if tmp.empty:
             continue
-        for service_date, day in tmp.groupby("service_date"):
+        for service_date, day in tmp.groupby("service_date", observed=True):
             chosen = day.sort_values("observation_ts", ascending=False, kind="stable").iloc[0]
             rows.append(
                 {
@@ -187,7 +317,7 @@ def render_car_summary(car_df: pd.DataFrame) -> None:
     latest_date = car_series["service_date"].max()
     latest = car_series[car_series["service_date"] == latest_date]
     avg_by_route = (
-        car_series.groupby("route_name", as_index=False)["auto_minutes"]
+        car_series.groupby("route_name", as_index=False, observed=True)["auto_minutes"]
         .mean()
         .rename(columns={"auto_minutes": "avg_auto_minutes"})
     )
@@ -207,62 +337,48 @@ def render_car_summary(car_df: pd.DataFrame) -> None:
             col.metric(label, f"Ø {avg_val} min", f"Heute: {today_val} min")
 
 
-def _cell_value(row: pd.Series) -> str:
-    if bool(row["canceled"]):
-        return "Ausfall"
-    dep_token = "-" if bool(row["effective_departure_unknown"]) else str(int(float(row["delay_minutes"])))
-    if bool(row["arrival_observed"]):
-        arr = int(float(row["arrival_delay_minutes"]))
-        actual_arrival = row.get("actual_arrival")
-        if pd.notna(actual_arrival):
-            arrival_time = pd.to_datetime(actual_arrival).strftime("%H:%M")
-            return f"S:{dep_token} A:{arr} ({arrival_time})"
-        return f"S:{dep_token} A:{arr}"
-    return f"S:{dep_token} A:-"
-
-
-def _delay_color(delay: float) -> str:
-    if delay < 5:
-        return "#2e7d32"  # green
-    if delay <= 15:
-        return "#ef6c00"  # orange
-    return "#c62828"  # red
-
-
-def _style_day_cell(value: object) -> str:
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return ""
-
-    text = str(value)
-    if not text:
-        return ""
-
-    if "Ausfall" in text:
-        return "background-color: #7b1fa2; color: white; font-weight: 600;"
-
-    match = re.search(r"S:(-|\d+)\s+A:(-|\d+)", text)
-    if not match:
-        return ""
-
-    dep_token = match.group(1)
-    arr_token = match.group(2)
-    levels: list[int] = []
-    if re.fullmatch(r"\d+", dep_token):
-        levels.append(int(dep_token))
-    if re.fullmatch(r"\d+", arr_token):
-        levels.append(int(arr_token))
-    if not levels:
-        return ""
-    level = max(levels)
-    color = _delay_color(level)
-    text_color = "white" if color in {"#2e7d32", "#c62828"} else "black"
+def _day_cell_values(frame: pd.DataFrame) -> pd.Series:
+    dep_token = frame["delay_minutes"].fillna(0).astype("int64").astype(str)
+    dep_token = dep_token.mask(frame["effective_departure_unknown"], "-")
+
+    arrival_time = pd.to_datetime(frame["actual_arrival"]).dt.strftime("%H:%M")
+    arr_token = frame["arrival_delay_minutes"].fillna(0).astype("int64").astype(str)
+    arr_token = arr_token.where(arrival_time.isna(), arr_token + " (" + arrival_time + ")")
+    arr_token = arr_token.where(frame["arrival_observed"], "-")
+
+    return ("S:" + dep_token + " A:" + arr_token).mask(frame["canceled"], "Ausfall")
+
+
+def _whole_minutes(values: pd.Series) -> pd.Series:
+    # Averages are shown truncated to whole minutes; missing values stay <NA>.
+    return np.trunc(values.astype(float)).astype("Int64")
+
+
+def _cell_style(color: str, text_color: str) -> str:
     return f"background-color: {color}; color: {text_color}; font-weight: 600;"
 
 
-def style_matrix(matrix: pd.DataFrame, day_cols: list[str]) -> pd.io.formats.style.Styler:
+CANCELED_CELL_STYLE = _cell_style("#7b1fa2", "white")
+DELAY_CELL_STYLES = (
+    _cell_style("#2e7d32", "white"),  # green: < 5 min
+    _cell_style("#ef6c00", "black"),  # orange: <= 15 min
+    _cell_style("#c62828", "white"),  # red: > 15 min
+)
+
+
+def _day_cell_styles(frame: pd.DataFrame) -> pd.Series:
+    # Color by the worse of the known start and arrival delays, matching _day_cell_values.
+    dep_level = frame["delay_minutes"].astype(float).where(~frame["effective_departure_unknown"])
+    arr_level = frame["arrival_delay_minutes"].astype(float).where(frame["arrival_observed"])
+    level = pd.concat([dep_level, arr_level], axis=1).max(axis=1)
+    styles = np.select([level < 5, level <= 15, level > 15], DELAY_CELL_STYLES, default="")
+    return pd.Series(styles, index=frame.index, dtype=object).mask(frame["canceled"], CANCELED_CELL_STYLE)
+
+
+def style_matrix(matrix: pd.DataFrame, day_cols: list[str], day_styles: pd.DataFrame) -> pd.io.formats.style.Styler:
     styler = matrix.style
     if day_cols:
-        styler = styler.map(_style_day_cell, subset=day_cols)
+        styler = styler.apply(lambda _: day_styles, axis=None, subset=day_cols)
 
     if "Ø Start-Verspätung (30d)" in matrix.columns:
         styler = styler.format({"Ø Start-Verspätung (30d)": "{:.0f}"})
@@ -272,61 +388,58 @@ def style_matrix(matrix: pd.DataFrame, day_cols: list[str]) -> pd.io.formats.sty
     return styler
 
 
-def build_route_matrix(df: pd.DataFrame, route_label: str, end_date: date, days: int = 30) -> tuple[pd.DataFrame, list[str]]:
+@st.cache_data(ttl=60, show_spinner=False, hash_funcs={pd.DataFrame: _frame_token})
+def build_route_matrix(
+    df: pd.DataFrame, route_label: str, end_date: date, days: int = 30
+) -> tuple[pd.DataFrame, list[str], pd.DataFrame]:
+    if df.empty:
+        return df, [], pd.DataFrame()
+
     route_df = df[df["route_label"] == route_label].copy()
     if route_df.empty:
-        return route_df, []
+        return route_df, [], pd.DataFrame()
 
-    start_date = end_date - timedelta(days=days - 1)
-    route_30 = route_df[(route_df["service_date"] >= start_date) & (route_df["service_date"] <= end_date)].copy()
+    start_ts = pd.Timestamp(end_date - timedelta(days=days - 1))
+    end_ts = pd.Timestamp(end_date)
+    route_30 = route_df[(route_df["service_date"] >= start_ts) & (route_df["service_date"] <= end_ts)].copy()
     if route_30.empty:
-        return route_30, []
-
-    route_30["day_cell"] = route_30.apply(_cell_value, axis=1)
-
-    pivot = (
-        route_30.pivot_table(index="zug", columns="service_date", values="day_cell", aggfunc="first")
-        .sort_index(axis=1)
-        .reset_index()
-        .rename(columns={"zug": "Zug"})
-    )
+        return route_30, [], pd.DataFrame()
 
-    metric_base = route_30.copy()
-    metric_base.loc[metric_base["canceled"], ["delay_minutes", "arrival_delay_minutes"]] = pd.NA
-    metric_base.loc[~metric_base["arrival_observed"], ["arrival_delay_minutes"]] = pd.NA
+    route_30["day_cell"] = _day_cell_values(route_30)
+    route_30["day_style"] = _day_cell_styles(route_30)
 
-    avg_dep = metric_base.groupby("zug", dropna=False)["delay_minutes"].mean().apply(
-        lambda x: int(float(x)) if pd.notna(x) else pd.NA
+    day_pivot = route_30.pivot_table(
+        index="zug",
+        columns="service_date",
+        values=["day_cell", "day_style"],
+        aggfunc="first",
+        observed=True,
     )
-    avg_arr = metric_base.groupby("zug", dropna=False)["arrival_delay_minutes"].mean().apply(
-        lambda x: int(float(x)) if pd.notna(x) else pd.NA
+    pivot = day_pivot["day_cell"].sort_index(axis=1)
+    style_pivot = day_pivot["day_style"].reindex(columns=pivot.columns)
+
+    metric_base = route_30[["zug", "departure_hhmm", "delay_minutes", "arrival_delay_minutes"]].copy()
+    metric_base.loc[route_30["canceled"], ["delay_minutes", "arrival_delay_minutes"]] = pd.NA
+    metric_base.loc[~route_30["arrival_observed"], ["arrival_delay_minutes"]] = pd.NA
+
+    # One pass over the categorical zug key; the pivot shares the same index, so joins need no rehashing.
+    per_train = metric_base.groupby("zug", observed=True).agg(
+        avg_dep=("delay_minutes", "mean"),
+        avg_arr=("arrival_delay_minutes", "mean"),
+        departure_hhmm=("departure_hhmm", "first"),
     )
-    cancel_days = (
-        route_30[route_30["canceled"]]
-        .groupby("zug", dropna=False)["service_date"]
-        .nunique()
-        .rename("Ausfalltage (30d)")
-    )
-
-    summary = pd.DataFrame(
-        {
-            "Zug": avg_dep.index,
-            "Ø Start-Verspätung (30d)": avg_dep.values,
-            "Ø Ankunfts-Verspätung (30d)": avg_arr.values,
-        }
-    )
-    summary = summary.merge(cancel_days.reset_index().rename(columns={"zug": "Zug"}), on="Zug", how="left")
-    summary["Ausfalltage (30d)"] = summary["Ausfalltage (30d)"].fillna(0).astype(int)
+    cancel_days = route_30[route_30["canceled"]].groupby("zug", observed=True)["service_date"].nunique()
 
-    result = pivot.merge(summary, on="Zug", how="left")
+    per_train["Ø Start-Verspätung (30d)"] = _whole_minutes(per_train["avg_dep"])
+    per_train["Ø Ankunfts-Verspätung (30d)"] = _whole_minutes(per_train["avg_arr"])
+    per_train["Ausfalltage (30d)"] = cancel_days.reindex(per_train.index, fill_value=0).astype(int)
 
-    meta = (
-        route_30.groupby("zug", as_index=False)
-        .agg(departure_hhmm=("departure_hhmm", "first"))
-        .rename(columns={"zug": "Zug"})
+    result = (
+        pivot.join(per_train.drop(columns=["avg_dep", "avg_arr"]))
+        .rename_axis("Zug")
+        .reset_index()
+        .sort_values(by=["departure_hhmm", "Zug"], kind="stable")
     )
-    result = result.merge(meta, on="Zug", how="left")
-    result = result.sort_values(by=["departure_hhmm", "Zug"], kind="stable")
 
     rename_map: dict[object, str] = {}
     day_cols: list[str] = []
@@ -337,18 +450,26 @@ def build_route_matrix(df: pd.DataFrame, route_label: str, end_date: date, days:
             day_cols.append(label)
     result = result.rename(columns=rename_map)
 
+    # Styles are precomputed per cell so rendering needs no parsing of the cell text.
+    day_styles = (
+        style_pivot.reindex(result["Zug"])
+        .set_axis(result.index, axis=0)
+        .rename(columns=rename_map)
+        .fillna("")
+    )
+
     result = result.drop(columns=["departure_hhmm"])
 
     summary_cols = ["Ø Start-Verspätung (30d)", "Ø Ankunfts-Verspätung (30d)", "Ausfalltage (30d)"]
     ordered_cols = [c for c in result.columns if c not in summary_cols] + summary_cols
-    return result[ordered_cols], day_cols
+    return result[ordered_cols], day_cols, day_styles[day_cols]
 
 
 def _build_train_history(train_df: pd.DataFrame) -> pd.DataFrame:
     history_source = train_df.copy()
     history_source.loc[~history_source["arrival_observed"], ["arrival_delay_minutes"]] = pd.NA
     history = (
-        history_source.groupby("service_date", as_index=False)
+        history_source.groupby("service_date", as_index=False, observed=True)
         .agg(
             start_delay=("delay_minutes", "mean"),
             arrival_delay=("arrival_delay_minutes", "mean"),
@@ -357,76 +478,113 @@ def _build_train_history(train_df: pd.DataFrame) -> pd.DataFrame:
         )
         .sort_values("service_date")
     )
-    history["start_delay"] = history["start_delay"].apply(lambda x: int(float(x)) if pd.notna(x) else 0)
-    history["arrival_delay"] = history["arrival_delay"].apply(lambda x: int(float(x)) if pd.notna(x) else None)
     history["service_date"] = pd.to_datetime(history["service_date"])
+    if len(history) > HISTORY_MAX_POINTS:
+        history = (
+            history.set_index("service_date")
+            .resample("W")
+            .agg({"start_delay": "mean", "arrival_delay": "mean", "canceled": "max", "arrival_observed": "max"})
+            .dropna(subset=["canceled"])
+            .reset_index()
+        )
+        history["canceled"] = history["canceled"].astype(bool)
+        history["arrival_observed"] = history["arrival_observed"].astype(bool)
+    history["start_delay"] = _whole_minutes(history["start_delay"]).fillna(0).astype("int64")
+    history["arrival_delay"] = _whole_minutes(history["arrival_delay"])
     return history
 
 
 def _reason_stats(train_df: pd.DataFrame) -> pd.DataFrame:
-    records: list[dict[str, object]] = []
-
-    for _, row in train_df.iterrows():
-        dep_reason = (row.get("departure_reason") or "").strip()
-        arr_reason = (row.get("arrival_reason") or "").strip()
-        dep_delay = int(float(row.get("delay_minutes", 0) or 0))
-        arr_delay = int(float(row.get("arrival_delay_minutes", 0) or 0))
-        canceled = bool(row.get("canceled", False))
-
-        if canceled:
-            records.append(
-                {
-                    "Bereich": "Start",
-                    "Grund": dep_reason or "Ausfall",
-                    "Verspätung": dep_delay,
-                }
-            )
-            records.append(
-                {
-                    "Bereich": "Ankunft",
-                    "Grund": arr_reason or dep_reason or "Ausfall",
-                    "Verspätung": arr_delay,
-                }
-            )
-            continue
-
-        if dep_delay > 0:
-            records.append(
-                {
-                    "Bereich": "Start",
-                    "Grund": dep_reason or "Unbekannt",
-                    "Verspätung": dep_delay,
-                }
-            )
-        if arr_delay > 0:
-            records.append(
-                {
-                    "Bereich": "Ankunft",
-                    "Grund": arr_reason or dep_reason or "Unbekannt",
-                    "Verspätung": arr_delay,
-                }
-            )
+    dep_reason = train_df["departure_reason"].fillna("").astype(str).str.strip()
+    arr_reason = train_df["arrival_reason"].fillna("").astype(str).str.strip()
+    dep_delay = train_df["delay_minutes"].fillna(0).astype(float).astype("int64")
+    arr_delay = train_df["arrival_delay_minutes"].fillna(0).astype(float).astype("int64")
+    canceled = train_df["canceled"].astype(bool)
+
+    fallback = pd.Series("Unbekannt", index=train_df.index).mask(canceled, "Ausfall")
+    dep_grund = dep_reason.where(dep_reason != "", fallback)
+    arr_grund = arr_reason.where(arr_reason != "", dep_grund)
+
+    # Canceled trains count in both areas; otherwise only actually delayed legs.
+    start_rows = pd.DataFrame({"Bereich": "Start", "Grund": dep_grund, "Verspätung": dep_delay})
+    arrival_rows = pd.DataFrame({"Bereich": "Ankunft", "Grund": arr_grund, "Verspätung": arr_delay})
+    reason_df = pd.concat(
+        [start_rows[canceled | (dep_delay > 0)], arrival_rows[canceled | (arr_delay > 0)]],
+        ignore_index=True,
+    )
 
-    if not records:
+    if reason_df.empty:
         return pd.DataFrame(columns=["Bereich", "Grund", "Anzahl", "Ø Verspätung"])
 
-    reason_df = pd.DataFrame(records)
     result = (
-        reason_df.groupby(["Bereich", "Grund"], as_index=False)
+        reason_df.groupby(["Bereich", "Grund"], as_index=False, observed=True)
         .agg(Anzahl=("Grund", "size"), avg_delay=("Verspätung", "mean"))
         .sort_values(["Bereich", "Anzahl", "avg_delay"], ascending=[True, False, False])
     )
-    result["Ø Verspätung"] = result["avg_delay"].apply(lambda x: int(float(x)) if pd.notna(x) else 0)
+    result["Ø Verspätung"] = _whole_minutes(result["avg_delay"]).fillna(0).astype("int64")
     return result.drop(columns=["avg_delay"])
 
 
+# Keyed on the train as well: frames of different trains from the same run share a token.
+@st.cache_data(ttl=60, show_spinner=False, hash_funcs={pd.DataFrame: _frame_token})
+def _history_figure(train_df: pd.DataFrame, route_label: str, train: str) -> go.Figure:
+    history = _build_train_history(train_df)
+
+    # WebGL and plain lines keep long series cheap to ship and draw.
+    long_series = len(history) > HISTORY_WEBGL_POINTS
+    line_trace = go.Scattergl if long_series else go.Scatter
+    line_mode = "lines" if long_series else "lines+markers"
+
+    fig = go.Figure()
+    fig.add_trace(
+        line_trace(
+            x=history["service_date"],
+            y=history["start_delay"],
+            mode=line_mode,
+            name="Start-Verspätung",
+            line=dict(color="#1f77b4", width=2),
+        )
+    )
+    fig.add_trace(
+        line_trace(
+            x=history["service_date"],
+            y=history["arrival_delay"],
+            mode=line_mode,
+            name="Ankunfts-Verspätung",
+            line=dict(color="#ff7f0e", width=2),
+        )
+    )
+
+    canceled_points = history[history["canceled"]]
+    if not canceled_points.empty:
+        fig.add_trace(
+            go.Scatter(
+                x=canceled_points["service_date"],
+                y=[0] * len(canceled_points),
+                mode="markers",
+                name="Ausfall",
+                marker=dict(color="#7b1fa2", size=10, symbol="x"),
+            )
+        )
+
+    fig.update_layout(
+        xaxis_title="Datum",
+        yaxis_title="Verspätung (Minuten)",
+        height=320,
+        margin=dict(l=20, r=20, t=30, b=20),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        uirevision="history",
+    )
+    return fig
+
+
 def render_train_expandable_charts(df: pd.DataFrame, route_label: str) -> None:
     route_df = df[df["route_label"] == route_label].copy()
     if route_df.empty:
         return
 
     trains = (
-        route_df.groupby("zug", as_index=False)
+        route_df.groupby("zug", as_index=False, observed=True)
         .agg(departure_hhmm=("departure_hhmm", "first"))
         .sort_values(by=["departure_hhmm", "zug"], kind="stable")
     )
@@ -435,49 +593,11 @@ def render_train_expandable_charts(df: pd.DataFrame, route_label: str) -> None:
     for train in trains["zug"]:
         with st.expander(train):
             train_df = route_df[route_df["zug"] == train].copy()
-            history = _build_train_history(train_df)
-
-            fig = go.Figure()
-            fig.add_trace(
-                go.Scatter(
-                    x=history["service_date"],
-                    y=history["start_delay"],
-                    mode="lines+markers",
-                    name="Start-Verspätung",
-                    line=dict(color="#1f77b4", width=2),
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=history["service_date"],
-                    y=history["arrival_delay"],
-                    mode="lines+markers",
-                    name="Ankunfts-Verspätung",
-                    line=dict(color="#ff7f0e", width=2),
-                )
-            )
-
-            canceled_points = history[history["canceled"]]
-            if not canceled_points.empty:
-                fig.add_trace(
-                    go.Scatter(
-                        x=canceled_points["service_date"],
-                        y=[0] * len(canceled_points),
-                        mode="markers",
-                        name="Ausfall",
-                        marker=dict(color="#7b1fa2", size=10, symbol="x"),
-                    )
-                )
-
-            fig.update_layout(
-                xaxis_title="Datum",
-                yaxis_title="Verspätung (Minuten)",
-                height=320,
-                margin=dict(l=20, r=20, t=30, b=20),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            )
+            # Figures are only built for trains whose history is actually requested.
             chart_key = f"history-chart-{route_label}-{train}"
-            st.plotly_chart(fig, use_container_width=True, key=chart_key)
+            if st.toggle("Verlauf anzeigen", key=f"history-toggle-{route_label}-{train}"):
+                fig = _history_figure(train_df, route_label, train)
+                st.plotly_chart(fig, use_container_width=True, key=chart_key)
 
             reason_stats = _reason_stats(train_df)
             st.markdown("**Statistik der Verspätungsgründe**")
@@ -495,34 +615,37 @@ def main() -> None:
     )
 
     settings = load_settings()
-    df = load_data(settings.database_path, settings.timezone)
-    car_df = load_car_data(settings.database_path)
+    db_version = _db_version(settings.database_path)
+    df = load_data(settings.database_path, settings.timezone, db_version)
+    car_df = load_car_data(settings.database_path, db_version)
 
     if df.empty:
         st.info("Noch keine Daten vorhanden. Erst `python run_collection.py` ausführen.")
         return
 
-    max_date = max(df["service_date"])
+    max_date = df["service_date"].max().date()
     end_date = st.date_input("Berichts-Enddatum", value=max_date)
     render_car_summary(car_df)
 
-    route_payloads: list[tuple[str, pd.DataFrame, list[str]]] = []
+    route_payloads: list[tuple[str, pd.DataFrame, list[str], pd.DataFrame]] = []
     for route_label in ROUTE_ORDER:
-        matrix, day_cols = build_route_matrix(df, route_label=route_label, end_date=end_date, days=30)
-        route_payloads.append((route_label, matrix, day_cols))
+        matrix, day_cols, day_styles = build_route_matrix(
+            df, route_label=route_label, end_date=end_date, days=MATRIX_DAYS
+        )
+        route_payloads.append((route_label, matrix, day_cols, day_styles))
 
     # 1) Main tables first, one below another.
-    for route_label, matrix, day_cols in route_payloads:
+    for route_label, matrix, day_cols, day_styles in route_payloads:
         st.subheader(ROUTE_TITLES.get(route_label, route_label))
         if matrix.empty:
-            st.write("Keine Daten für die letzten 30 Tage vorhanden.")
+            st.write(f"Keine Daten für die letzten {MATRIX_DAYS} Tage vorhanden.")
             continue
 
-        styled = style_matrix(matrix, day_cols)
+        styled = style_matrix(matrix, day_cols, day_styles)
         st.dataframe(styled, use_container_width=True, hide_index=True)
 
     # 2) Then train histories, separated by route.
-    for route_label, _, _ in route_payloads:
+    for route_label, _, _, _ in route_payloads:
         st.subheader(f"Verlauf je Zug: {ROUTE_TITLES.get(route_label, route_label)}")
         render_train_expandable_charts(df, route_label)
 
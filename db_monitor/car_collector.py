@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -9,7 +10,7 @@ from db_monitor.config import CarRoute, Settings
 from db_monitor.models import CarObservation
 
 
-def _fetch_route_duration(settings: Settings, route: CarRoute) -> tuple[int, float]:
+def _fetch_route_duration(session: requests.Session, settings: Settings, route: CarRoute) -> tuple[int, float]:
     if not settings.ors_api_key:
         raise ValueError("Set ORS_API_KEY to collect car travel times.")
 
@@ -24,7 +25,7 @@ def _fetch_route_duration(settings: Settings, route: CarRoute) -> tuple[int, flo
         ]
     }
 
-    response = requests.post(
+    response = session.post(
         settings.ors_directions_endpoint,
         json=payload,
         headers=headers,
@@ -47,25 +48,26 @@ def collect_car_observations(settings: Settings, routes: list[CarRoute]) -> list
     now = datetime.now(tz)
     service_date = now.date().isoformat()
 
-    rows: list[CarObservation] = []
-    for route in routes:
-        # Only collect a route once its relevant departure time has started.
-        # Example: Offenburg->Freiburg should not be collected before 16:30.
-        if now.time() < route.target_departure:
-            continue
+    # Only collect a route once its relevant departure time has started.
+    # Example: Offenburg->Freiburg should not be collected before 16:30.
+    due_routes = [route for route in routes if now.time() >= route.target_departure]
+    if not due_routes:
+        return []
 
-        duration, distance_km = _fetch_route_duration(settings, route)
-        rows.append(
-            CarObservation(
-                observation_ts=now,
-                service_date=service_date,
-                route_label=route.label,
-                from_name=route.from_name,
-                to_name=route.to_name,
-                target_departure_time=route.target_departure.strftime("%H:%M"),
-                duration_minutes=duration,
-                distance_km=distance_km,
-            )
-        )
+    # Routes are independent requests; fetch them in parallel over one pooled session.
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=len(due_routes)) as pool:
+        results = list(pool.map(lambda route: _fetch_route_duration(session, settings, route), due_routes))
 
-    return rows
+    return [
+        CarObservation(
+            observation_ts=now,
+            service_date=service_date,
+            route_label=route.label,
+            from_name=route.from_name,
+            to_name=route.to_name,
+            target_departure_time=route.target_departure.strftime("%H:%M"),
+            duration_minutes=duration,
+            distance_km=distance_km,
+        )
+        for route, (duration, distance_km) in zip(due_routes, results)
+    ]
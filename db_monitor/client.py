@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -8,11 +9,22 @@ from requests import Response
 from urllib3.util.retry import Retry
 
 from db_monitor.config import Settings
+from db_monitor.http_cache import ResponseCache
+
+
+HTTP_POOL_SIZE = 8
+EMPTY_TIMETABLE = b"<timetable/>"
+# Plans for hours that have not fully passed yet may still be amended upstream;
+# the running hour changes most often, later hours only occasionally.
+CURRENT_PLAN_MAX_AGE_SECONDS = 60
+OPEN_PLAN_MAX_AGE_SECONDS = 3600
 
 
 class DBApiClient:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self.cache = ResponseCache(settings.http_cache_path) if settings.http_cache_path else None
+        self._station_evas: dict[str, str] = {}
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -28,7 +40,8 @@ class DBApiClient:
             status_forcelist=(429, 500, 502, 503, 504),
             allowed_methods=frozenset({"GET"}),
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        # Keep enough pooled keep-alive connections per host for concurrent plan requests.
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
 
@@ -45,6 +58,23 @@ class DBApiClient:
             ) from exc
 
     def get_station_eva(self, station_name: str) -> str:
+        if station_name not in self._station_evas:
+            self._station_evas[station_name] = self._cached_station_eva(station_name)
+        return self._station_evas[station_name]
+
+    def _cached_station_eva(self, station_name: str) -> str:
+        # EVA numbers are stable identifiers, so resolved stations never expire on disk.
+        cache_key = f"eva/{station_name}"
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        eva = self._lookup_station_eva(station_name)
+        if self.cache is not None:
+            self.cache.set(cache_key, eva)
+        return eva
+
+    def _lookup_station_eva(self, station_name: str) -> str:
         response = self.session.get(
             f"{self.settings.station_endpoint}/stations",
             params={"searchstring": station_name, "limit": 5},
@@ -64,8 +94,31 @@ class DBApiClient:
 
         return str(result_set[0]["evaNumbers"][0]["number"])
 
-    def get_plan(self, eva: str, service_date: date, hour: int) -> str:
+    def _plan_fresh_after(self, service_date: date, hour: int) -> float:
+        # A plan fetched after its hour ended never changes again; younger ones expire after a while.
+        tz = ZoneInfo(self.settings.timezone)
+        hour_start = datetime.combine(service_date, time(hour), tzinfo=tz)
+        hour_end = hour_start + timedelta(hours=1)
+        now = datetime.now(tz)
+        if hour_end <= now:
+            return hour_end.timestamp()
+        if hour_start <= now:
+            return now.timestamp() - CURRENT_PLAN_MAX_AGE_SECONDS
+        return now.timestamp() - OPEN_PLAN_MAX_AGE_SECONDS
+
+    def _stale_plan(self, cache_key: str) -> bytes:
+        # On upstream trouble an outdated plan is still better than an empty one.
+        stale = self.cache.get(cache_key) if self.cache is not None else None
+        return stale if stale is not None else EMPTY_TIMETABLE
+
+    def get_plan(self, eva: str, service_date: date, hour: int) -> bytes:
         date_token = service_date.strftime("%y%m%d")
+        cache_key = f"plan/{eva}/{date_token}/{hour:02d}"
+        if self.cache is not None:
+            cached = self.cache.get(cache_key, fresh_after=self._plan_fresh_after(service_date, hour))
+            if cached is not None:
+                return cached
+
         endpoint = "timetables/v1/plan"
         url = f"{self.settings.timetables_endpoint}/plan/{eva}/{date_token}/{hour:02d}"
         try:
@@ -76,21 +129,24 @@ class DBApiClient:
             )
         except requests.RequestException as exc:
             print(f"WARN: {endpoint} request failed for {url}: {exc}")
-            return "<timetable/>"
+            return self._stale_plan(cache_key)
         if response.status_code == 404:
             # Some stations/hours legitimately have no plan payload.
             # Return an empty timetable so collectors can continue.
-            return "<timetable/>"
+            return EMPTY_TIMETABLE
         try:
             self._raise_with_context(response, endpoint)
         except requests.HTTPError:
             if 500 <= response.status_code < 600:
                 print(f"WARN: {endpoint} temporary upstream error ({response.status_code}) for {url}")
-                return "<timetable/>"
+                return self._stale_plan(cache_key)
             raise
-        return response.text
+        if self.cache is not None:
+            self.cache.set(cache_key, response.content)
+        # Raw bytes: the XML parser decodes per the document's own declaration.
+        return response.content
 
-    def get_changes(self, eva: str) -> str:
+    def get_changes(self, eva: str) -> bytes:
         endpoint = "timetables/v1/fchg"
         url = f"{self.settings.timetables_endpoint}/fchg/{eva}"
         try:
@@ -101,12 +157,12 @@ class DBApiClient:
             )
         except requests.RequestException as exc:
             print(f"WARN: {endpoint} request failed for {url}: {exc}")
-            return "<timetable/>"
+            return EMPTY_TIMETABLE
         try:
             self._raise_with_context(response, endpoint)
         except requests.HTTPError:
             if 500 <= response.status_code < 600:
                 print(f"WARN: {endpoint} temporary upstream error ({response.status_code}) for {url}")
-                return "<timetable/>"
+                return EMPTY_TIMETABLE
             raise
-        return response.text
+        return response.content
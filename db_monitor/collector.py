@@ -1,22 +1,32 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import islice
+from operator import attrgetter
 from zoneinfo import ZoneInfo
 
-from db_monitor.client import DBApiClient
+from db_monitor.client import HTTP_POOL_SIZE, DBApiClient
 from db_monitor.config import RouteWindow, Settings
 from db_monitor.models import Observation, PlannedStop
 from db_monitor.parser import parse_arrivals_plan, parse_changes, parse_departures_plan
 
 
-def _hour_range(window: RouteWindow) -> list[int]:
-    return list(range(window.start_time.hour, window.end_time.hour + 1))
+_ONE_HOUR = timedelta(hours=1)
+_LOOKAHEAD_HOURS = 3
+_LOOKAHEAD = timedelta(hours=_LOOKAHEAD_HOURS)
 
 
-def _arrival_hour_range(window: RouteWindow, lookahead_hours: int = 3) -> list[int]:
+def _hour_range(window: RouteWindow) -> range:
+    return range(window.start_time.hour, window.end_time.hour + 1)
+
+
+def _arrival_hour_range(window: RouteWindow, lookahead_hours: int = _LOOKAHEAD_HOURS) -> range:
     start = window.start_time.hour
     end = min(23, window.end_time.hour + lookahead_hours)
-    return list(range(start, end + 1))
+    return range(start, end + 1)
 
 
 def _minutes_delta(actual: datetime | None, planned: datetime | None) -> int:
@@ -38,48 +48,94 @@ def _dedupe_stops(stops: list[PlannedStop], mode: str) -> list[PlannedStop]:
     return deduped
 
 
+def _arrival_sort_key(stop: PlannedStop) -> datetime:
+    return stop.planned_arrival or datetime.max
+
+
+def _index_arrivals(arrivals: list[PlannedStop]) -> tuple[dict[str, PlannedStop], dict[str, list[PlannedStop]]]:
+    # `arrivals` is sorted by planned arrival, so each per-name list stays sorted for bisecting.
+    by_id: dict[str, PlannedStop] = {}
+    by_name: dict[str, list[PlannedStop]] = defaultdict(list)
+    for arrival in arrivals:
+        if arrival.train_id:
+            by_id.setdefault(arrival.train_id, arrival)
+        by_name[arrival.train_name].append(arrival)
+    return by_id, by_name
+
+
+def _first_unused(candidates: list[PlannedStop], start: int, used_ids: set[str]) -> PlannedStop | None:
+    return next((x for x in islice(candidates, start, None) if x.train_id not in used_ids), None)
+
+
+def _closest_arrival(candidates: list[PlannedStop], departure_time: datetime, used_ids: set[str]) -> PlannedStop | None:
+    split = bisect_left(candidates, departure_time, key=_arrival_sort_key)
+
+    # Prefer the first arrival at or after departure within 5h.
+    after = _first_unused(candidates, split, used_ids)
+    if after is not None and after.planned_arrival is None:
+        after = None
+    after_diff = int((after.planned_arrival - departure_time).total_seconds() / 60) if after else 0
+    if after is not None and after_diff <= 300:
+        return after
+
+    # Fallback: nearest by absolute distance; on ties the earlier arrival wins.
+    before = next((candidates[k] for k in range(split - 1, -1, -1) if candidates[k].train_id not in used_ids), None)
+    if before is not None:
+        equal_start = bisect_left(candidates, before.planned_arrival, key=_arrival_sort_key)
+        before = _first_unused(candidates, equal_start, used_ids)
+        before_diff = int((departure_time - before.planned_arrival).total_seconds() / 60)
+        if after is None or before_diff <= after_diff:
+            return before
+    if after is not None:
+        return after
+    # Only arrivals without a planned time are left.
+    return _first_unused(candidates, 0, used_ids)
+
+
 def _match_arrival_for_departure(
     departure: PlannedStop,
-    arrivals: list[PlannedStop],
+    arrivals_by_id: dict[str, PlannedStop],
+    arrivals_by_name: dict[str, list[PlannedStop]],
     used_ids: set[str],
 ) -> PlannedStop | None:
     if departure.train_id:
-        for candidate in arrivals:
-            if candidate.train_id == departure.train_id and candidate.train_id not in used_ids:
-                used_ids.add(candidate.train_id)
-                return candidate
-
-    same_name = [x for x in arrivals if x.train_name == departure.train_name and x.train_id not in used_ids]
-    if not same_name:
-        return None
+        candidate = arrivals_by_id.get(departure.train_id)
+        if candidate is not None and candidate.train_id not in used_ids:
+            used_ids.add(candidate.train_id)
+            return candidate
 
-    same_name.sort(key=lambda x: x.planned_arrival or datetime.max)
+    same_name = arrivals_by_name.get(departure.train_name, [])
     if departure.planned_departure is None:
-        chosen = same_name[0]
+        chosen = _first_unused(same_name, 0, used_ids)
+    else:
+        chosen = _closest_arrival(same_name, departure.planned_departure, used_ids)
+    if chosen is not None:
         used_ids.add(chosen.train_id)
-        return chosen
+    return chosen
 
-    # Prefer arrival closest after departure; fallback to nearest by absolute distance.
-    preferred: PlannedStop | None = None
-    preferred_minutes = 10**9
-    fallback = same_name[0]
-    fallback_abs = 10**9
 
-    for candidate in same_name:
-        if candidate.planned_arrival is None:
-            continue
-        diff = int((candidate.planned_arrival - departure.planned_departure).total_seconds() / 60)
-        abs_diff = abs(diff)
-        if abs_diff < fallback_abs:
-            fallback = candidate
-            fallback_abs = abs_diff
-        if 0 <= diff <= 300 and diff < preferred_minutes:
-            preferred = candidate
-            preferred_minutes = diff
-
-    chosen = preferred or fallback
-    used_ids.add(chosen.train_id)
-    return chosen
+def _fetch_window_payloads(
+    client: DBApiClient,
+    window: RouteWindow,
+    service_date: date,
+    source_eva: str,
+    target_eva: str,
+) -> tuple[bytes, bytes, list[bytes], list[bytes]]:
+    # All requests of a window are independent and latency-bound: issue them together,
+    # then parse afterwards. Rate limiting is still handled by the session's Retry policy.
+    with ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE) as pool:
+        source_changes = pool.submit(client.get_changes, source_eva)
+        target_changes = pool.submit(client.get_changes, target_eva)
+        departure_plans = [pool.submit(client.get_plan, source_eva, service_date, hour) for hour in _hour_range(window)]
+        arrival_plans = [
+            pool.submit(client.get_plan, target_eva, service_date, hour) for hour in _arrival_hour_range(window)
+        ]
+        return (
+            source_changes.result(),
+            target_changes.result(),
+            [future.result() for future in departure_plans],
+            [future.result() for future in arrival_plans],
+        )
 
 
 def collect_observations(settings: Settings, windows: list[RouteWindow]) -> list[Observation]:
@@ -89,20 +145,24 @@ def collect_observations(settings: Settings, windows: list[RouteWindow]) -> list
     service_date = now.date()
 
     client = DBApiClient(settings)
-    observations: list[Observation] = []
+    # Keyed by (route_label, train_id); the first observation per train wins.
+    observations: dict[tuple[str, str], Observation] = {}
 
     for window in windows:
         source_eva = window.source_eva or client.get_station_eva(window.source_station)
         target_eva = window.target_eva or client.get_station_eva(window.target_station)
 
-        source_changes = parse_changes(client.get_changes(source_eva))
-        target_changes = parse_changes(client.get_changes(target_eva))
+        source_xml, target_xml, departure_plans, arrival_plans = _fetch_window_payloads(
+            client, window, service_date, source_eva, target_eva
+        )
+        source_changes = parse_changes(source_xml)
+        target_changes = parse_changes(target_xml)
 
         departures: list[PlannedStop] = []
-        for hour in _hour_range(window):
+        for xml_payload in departure_plans:
             departures.extend(
                 parse_departures_plan(
-                    xml_payload=client.get_plan(source_eva, service_date, hour),
+                    xml_payload=xml_payload,
                     source_station=window.source_station,
                     target_station=window.target_station,
                     route_label=window.label,
@@ -114,13 +174,13 @@ def collect_observations(settings: Settings, windows: list[RouteWindow]) -> list
         departures = _dedupe_stops(departures, mode="departure")
 
         arrival_start = window.start_time
-        arrival_end = (datetime.combine(service_date, window.end_time) + timedelta(hours=3)).time()
+        arrival_end = (datetime.combine(service_date, window.end_time) + _LOOKAHEAD).time()
 
         arrivals: list[PlannedStop] = []
-        for hour in _arrival_hour_range(window):
+        for xml_payload in arrival_plans:
             arrivals.extend(
                 parse_arrivals_plan(
-                    xml_payload=client.get_plan(target_eva, service_date, hour),
+                    xml_payload=xml_payload,
                     source_station=window.source_station,
                     target_station=window.target_station,
                     route_label=window.label,
@@ -130,11 +190,12 @@ def collect_observations(settings: Settings, windows: list[RouteWindow]) -> list
             )
         arrivals.sort(key=lambda x: x.planned_arrival or datetime.max)
         arrivals = _dedupe_stops(arrivals, mode="arrival")
+        arrivals_by_id, arrivals_by_name = _index_arrivals(arrivals)
         used_arrival_ids: set[str] = set()
 
         for dep in departures:
             dep_change = source_changes.get(dep.train_id)
-            matched_arr = _match_arrival_for_departure(dep, arrivals, used_arrival_ids)
+            matched_arr = _match_arrival_for_departure(dep, arrivals_by_id, arrivals_by_name, used_arrival_ids)
             arr_change = target_changes.get(matched_arr.train_id) if matched_arr else None
 
             actual_departure = dep_change.changed_departure if dep_change else None
@@ -151,14 +212,14 @@ def collect_observations(settings: Settings, windows: list[RouteWindow]) -> list
                 continue
 
             planned_arrival = matched_arr.planned_arrival if matched_arr else None
-            arrival_deadline = planned_arrival + timedelta(hours=1) if planned_arrival else None
+            arrival_deadline = planned_arrival + _ONE_HOUR if planned_arrival else None
             within_capture_window = bool(arrival_deadline and now_local_naive <= arrival_deadline)
+            planned_arrival_passed = planned_arrival is not None and now_local_naive >= planned_arrival
 
             arrival_time_event_is_past = bool(
                 arr_change
                 and arr_change.changed_arrival is not None
-                and planned_arrival is not None
-                and now_local_naive >= planned_arrival
+                and planned_arrival_passed
                 and arr_change.changed_arrival <= now_local_naive
             )
             arrival_event_available = bool(
@@ -176,9 +237,8 @@ def collect_observations(settings: Settings, windows: list[RouteWindow]) -> list
                 arrival_event_available
                 or (
                     within_capture_window
-                    and planned_arrival is not None
                     and matched_arr is not None
-                    and now_local_naive >= planned_arrival
+                    and planned_arrival_passed
                 )
             )
 
@@ -198,36 +258,34 @@ def collect_observations(settings: Settings, windows: list[RouteWindow]) -> list
             arrival_info_missing = bool(planned_arrival and not arrival_observed and now_local_naive > arrival_deadline)
             canceled_any = canceled_departure or canceled_arrival
 
-            observations.append(
-                Observation(
-                    observation_ts=now,
-                    service_date=service_date.isoformat(),
-                    train_id=dep.train_id,
-                    train_name=dep.train_name,
-                    line=dep.line,
-                    route_label=dep.route_label,
-                    source_station=dep.source_station,
-                    target_station=dep.target_station,
-                    planned_departure=dep.planned_departure,
-                    actual_departure=actual_departure,
-                    planned_arrival=planned_arrival,
-                    actual_arrival=actual_arrival,
-                    delay_minutes=max(0, dep_deviation),
-                    schedule_deviation_minutes=dep_deviation,
-                    arrival_delay_minutes=max(0, arr_deviation),
-                    arrival_schedule_deviation_minutes=arr_deviation,
-                    arrival_observed=arrival_observed,
-                    arrival_info_missing=arrival_info_missing,
-                    departure_reason=departure_reason,
-                    arrival_reason=arrival_reason,
-                    canceled_departure=canceled_departure,
-                    canceled_arrival=canceled_arrival,
-                    canceled=canceled_any,
-                )
+            # Duplicates would be dropped anyway, so skip building them.
+            observation_key = (dep.route_label, dep.train_id)
+            if observation_key in observations:
+                continue
+            observations[observation_key] = Observation(
+                observation_ts=now,
+                service_date=service_date.isoformat(),
+                train_id=dep.train_id,
+                train_name=dep.train_name,
+                line=dep.line,
+                route_label=dep.route_label,
+                source_station=dep.source_station,
+                target_station=dep.target_station,
+                planned_departure=dep.planned_departure,
+                actual_departure=actual_departure,
+                planned_arrival=planned_arrival,
+                actual_arrival=actual_arrival,
+                delay_minutes=max(0, dep_deviation),
+                schedule_deviation_minutes=dep_deviation,
+                arrival_delay_minutes=max(0, arr_deviation),
+                arrival_schedule_deviation_minutes=arr_deviation,
+                arrival_observed=arrival_observed,
+                arrival_info_missing=arrival_info_missing,
+                departure_reason=departure_reason,
+                arrival_reason=arrival_reason,
+                canceled_departure=canceled_departure,
+                canceled_arrival=canceled_arrival,
+                canceled=canceled_any,
             )
 
-    dedup: dict[tuple[str, str], Observation] = {}
-    for row in observations:
-        dedup[(row.route_label, row.train_id)] = row
-
-    return sorted(dedup.values(), key=lambda x: (x.route_label, x.planned_departure, x.train_name))
+    return sorted(observations.values(), key=attrgetter("route_label", "planned_departure", "train_name"))
@@ -28,6 +28,8 @@ class Settings:
     database_path: str
     ors_api_key: str
     ors_directions_endpoint: str
+    # Empty path disables the on-disk API response cache.
+    http_cache_path: str = ""
 
 
 @dataclass(frozen=True)
@@ -77,6 +79,7 @@ def load_settings() -> Settings:
         ors_directions_endpoint=os.getenv(
             "ORS_DIRECTIONS_ENDPOINT", "https://api.openrouteservice.org/v2/directions/driving-car"
         ),
+        http_cache_path=os.getenv("HTTP_CACHE_PATH", "data/http_cache.db").strip(),
     )
 
 
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    stored_at REAL NOT NULL
+);
+"""
+
+
+# Small SQLite-backed key/value store for API payloads that rarely or never change.
+class ResponseCache:
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.path) as con:
+            con.executescript(SCHEMA)
+
+    def get(self, key: str, fresh_after: float = 0.0) -> str | bytes | None:
+        # Entries stored at or before `fresh_after` (epoch seconds) count as stale.
+        with sqlite3.connect(self.path) as con:
+            row = con.execute(
+                "SELECT payload, stored_at FROM responses WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or row[1] <= fresh_after:
+            return None
+        return row[0]
+
+    def set(self, key: str, payload: str | bytes) -> None:
+        with sqlite3.connect(self.path) as con:
+            con.execute(
+                """
+                INSERT INTO responses (cache_key, payload, stored_at) VALUES (?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET payload=excluded.payload, stored_at=excluded.stored_at
+                """,
+                (key, payload, time.time()),
+            )
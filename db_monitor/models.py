@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlannedStop:
     train_id: str
     train_name: str
@@ -16,7 +16,7 @@ class PlannedStop:
     route_label: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ChangeInfo:
     train_id: str
     changed_departure: datetime | None
@@ -26,7 +26,7 @@ class ChangeInfo:
     canceled: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Observation:
     observation_ts: datetime
     service_date: str
@@ -53,7 +53,7 @@ class Observation:
     canceled: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CarObservation:
     observation_ts: datetime
     service_date: str
@@ -1,16 +1,48 @@
 from __future__ import annotations
 
+import io
+from collections.abc import Iterator
 from datetime import datetime, time
+from functools import lru_cache
+
 from xml.etree import ElementTree as ET
 
 from db_monitor.models import ChangeInfo, PlannedStop
 
+# Compact train names carry no whitespace at all, e.g. "RE 7" -> "RE7".
+_STRIP_WS = str.maketrans("", "", " \t\r\n")
+# Message attributes joined, in this order, into a readable reason text.
+_REASON_KEYS = ("t", "txt", "cat", "c", "from", "to", "id")
+
 
+# The same planned times recur across hourly plans and the change feed.
+@lru_cache(maxsize=4096)
 def parse_db_time(raw: str) -> datetime:
     value = raw.strip()
-    if len(value) < 10:
+    if len(value) < 10 or not value[:10].isdigit():
         raise ValueError(f"Invalid DB timestamp: {raw}")
-    return datetime.strptime(value[:10], "%y%m%d%H%M")
+    # Fixed YYMMDDHHMM layout; slicing avoids strptime's per-call format parsing.
+    return datetime(
+        2000 + int(value[0:2]),
+        int(value[2:4]),
+        int(value[4:6]),
+        int(value[6:8]),
+        int(value[8:10]),
+    )
+
+
+def _iter_stops(xml_payload: bytes | str) -> Iterator[ET.Element]:
+    # Streams the <s> stop elements instead of building the whole timetable tree. Once the
+    # caller has moved on, the stop is dropped from the root so finished stops don't pile up.
+    source = io.BytesIO(xml_payload if isinstance(xml_payload, bytes) else xml_payload.encode("utf-8"))
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end" or elem.tag != "s":
+            continue
+        yield elem
+        root.clear()
 
 
 def _extract_path(stop: ET.Element) -> str:
@@ -27,56 +59,46 @@ def _extract_train_name(stop: ET.Element) -> tuple[str, str]:
     tl = stop.find("tl")
     if tl is None:
         return "Unbekannt", ""
+    return _train_name(tl.get("c") or "", tl.get("n") or "", tl.get("o") or "")
+
 
-    category = (tl.get("c") or "").strip()
-    number = (tl.get("n") or "").strip()
+# The same <tl> attributes repeat for a train across every hourly plan.
+@lru_cache(maxsize=1024)
+def _train_name(raw_category: str, raw_number: str, raw_operator: str) -> tuple[str, str]:
+    category = raw_category.strip()
+    number = raw_number.strip()
 
     if category and number:
-        compact = f"{category}{number}".replace(" ", "")
+        compact = f"{category}{number}".translate(_STRIP_WS)
         return compact, compact
     if number:
         return number, number
     if category:
         return category, category
 
-    fallback = ((tl.get("o") or "").strip() or "Unbekannt").replace(" ", "")
+    fallback = (raw_operator.strip() or "Unbekannt").translate(_STRIP_WS)
     return fallback, fallback
 
 
 def _extract_reasons(stop: ET.Element, node: ET.Element | None) -> str:
-    raw: list[str] = []
-
     # Messages can appear on stop level and event level (dp/ar).
-    scope_nodes = [stop]
+    messages = stop.findall("m")
     if node is not None:
-        scope_nodes.append(node)
-
-    for scope in scope_nodes:
-        for msg in scope.findall("m"):
-            parts: list[str] = []
-            for key in ("t", "txt", "cat", "c", "from", "to", "id"):
-                value = (msg.get(key) or "").strip()
-                if value:
-                    parts.append(value)
-            text = " ".join(parts).strip()
-            if not text:
-                text = (msg.text or "").strip()
-            if text:
-                raw.append(text)
-
-    # Keep first occurrence order and remove duplicates.
-    dedup: list[str] = []
-    seen: set[str] = set()
-    for item in raw:
-        if item in seen:
-            continue
-        seen.add(item)
-        dedup.append(item)
-    return " | ".join(dedup)
+        messages.extend(node.findall("m"))
+
+    # A dict keeps first occurrence order while dropping duplicates.
+    reasons: dict[str, None] = {}
+    for msg in messages:
+        text = " ".join(filter(None, ((msg.get(key) or "").strip() for key in _REASON_KEYS)))
+        if not text:
+            text = (msg.text or "").strip()
+        if text:
+            reasons[text] = None
+    return " | ".join(reasons)
 
 
 def _parse_plan_generic(
-    xml_payload: str,
+    xml_payload: bytes | str,
     source_station: str,
     target_station: str,
     route_label: str,
@@ -85,33 +107,38 @@ def _parse_plan_generic(
     mode: str,
     required_in_path: str,
 ) -> list[PlannedStop]:
-    root = ET.fromstring(xml_payload)
     rows: list[PlannedStop] = []
+    required_station = required_in_path.lower()
 
-    for stop in root.findall("s"):
+    for stop in _iter_stops(xml_payload):
         train_id = stop.get("id")
         if not train_id:
             continue
 
-        train_name, line = _extract_train_name(stop)
         dp = stop.find("dp")
         ar = stop.find("ar")
+        event_node, other_node = (dp, ar) if mode == "departure" else (ar, dp)
 
-        planned_departure = parse_db_time(dp.get("pt", "")) if dp is not None and dp.get("pt") else None
-        planned_arrival = parse_db_time(ar.get("pt", "")) if ar is not None and ar.get("pt") else None
-
-        event_time = planned_departure if mode == "departure" else planned_arrival
-        if event_time is None:
+        # Check the window on the event time first; most stops of an hourly plan fall outside it.
+        event_raw = event_node.get("pt") if event_node is not None else None
+        if not event_raw:
             continue
-        if event_time.time() < window_start or event_time.time() > window_end:
+        event_time = parse_db_time(event_raw)
+        if not window_start <= event_time.time() <= window_end:
             continue
 
         path_raw = _extract_path(stop)
-        if required_in_path and path_raw:
-            path_stations = [x.strip().lower() for x in path_raw.split("|") if x.strip()]
-            if required_in_path.lower() not in path_stations:
+        if required_station and path_raw:
+            path_stations = {x.strip().lower() for x in path_raw.split("|")}
+            if required_station not in path_stations:
                 continue
 
+        other_raw = other_node.get("pt") if other_node is not None else None
+        other_time = parse_db_time(other_raw) if other_raw else None
+        planned_departure, planned_arrival = (
+            (event_time, other_time) if mode == "departure" else (other_time, event_time)
+        )
+        train_name, line = _extract_train_name(stop)
         rows.append(
             PlannedStop(
                 train_id=train_id,
@@ -129,7 +156,7 @@ def _parse_plan_generic(
 
 
 def parse_departures_plan(
-    xml_payload: str,
+    xml_payload: bytes | str,
     source_station: str,
     target_station: str,
     route_label: str,
@@ -149,7 +176,7 @@ def parse_departures_plan(
 
 
 def parse_arrivals_plan(
-    xml_payload: str,
+    xml_payload: bytes | str,
     source_station: str,
     target_station: str,
     route_label: str,
@@ -170,11 +197,10 @@ def parse_arrivals_plan(
     )
 
 
-def parse_changes(xml_payload: str) -> dict[str, ChangeInfo]:
-    root = ET.fromstring(xml_payload)
+def parse_changes(xml_payload: bytes | str) -> dict[str, ChangeInfo]:
     result: dict[str, ChangeInfo] = {}
 
-    for stop in root.findall("s"):
+    for stop in _iter_stops(xml_payload):
         train_id = stop.get("id")
         if not train_id:
             continue
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import atexit
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, datetime
+from operator import attrgetter
 from pathlib import Path
+from typing import TypeVar
 
 from db_monitor.models import CarObservation, Observation
 
@@ -50,6 +57,104 @@ CREATE TABLE IF NOT EXISTS car_observations (
 """
 
 
+UPSERT_OBSERVATIONS_SQL = """
+INSERT INTO observations (
+    observation_ts, service_date, train_id, train_name, line, route_label,
+    source_station, target_station, planned_departure, actual_departure,
+    planned_arrival, actual_arrival, delay_minutes, schedule_deviation_minutes,
+    arrival_delay_minutes, arrival_schedule_deviation_minutes, arrival_observed, arrival_info_missing,
+    departure_reason, arrival_reason,
+    canceled_departure, canceled_arrival, canceled
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(service_date, train_id, route_label)
+DO UPDATE SET
+    observation_ts=excluded.observation_ts,
+    train_name=excluded.train_name,
+    line=excluded.line,
+    source_station=excluded.source_station,
+    target_station=excluded.target_station,
+    planned_departure=excluded.planned_departure,
+    actual_departure=excluded.actual_departure,
+    planned_arrival=excluded.planned_arrival,
+    actual_arrival=CASE
+        WHEN excluded.arrival_observed = 1 THEN excluded.actual_arrival
+        ELSE observations.actual_arrival
+    END,
+    delay_minutes=excluded.delay_minutes,
+    schedule_deviation_minutes=excluded.schedule_deviation_minutes,
+    arrival_delay_minutes=CASE
+        WHEN excluded.arrival_observed = 1 THEN excluded.arrival_delay_minutes
+        ELSE observations.arrival_delay_minutes
+    END,
+    arrival_schedule_deviation_minutes=CASE
+        WHEN excluded.arrival_observed = 1 THEN excluded.arrival_schedule_deviation_minutes
+        ELSE observations.arrival_schedule_deviation_minutes
+    END,
+    arrival_observed=observations.arrival_observed | excluded.arrival_observed,
+    arrival_info_missing=(observations.arrival_info_missing | excluded.arrival_info_missing)
+        AND NOT (observations.arrival_observed | excluded.arrival_observed),
+    departure_reason=excluded.departure_reason,
+    arrival_reason=CASE
+        WHEN excluded.arrival_observed = 1 OR coalesce(observations.arrival_reason, '') = '' THEN excluded.arrival_reason
+        ELSE observations.arrival_reason
+    END,
+    canceled_departure=excluded.canceled_departure,
+    canceled_arrival=CASE
+        WHEN excluded.arrival_observed = 1 THEN excluded.canceled_arrival
+        ELSE observations.canceled_arrival
+    END,
+    canceled=excluded.canceled
+"""
+
+# Bind parameters in the INSERT column order above; attrgetter builds each row tuple in C.
+_OBSERVATION_PARAMS = attrgetter(
+    "observation_ts", "service_date", "train_id", "train_name", "line", "route_label",
+    "source_station", "target_station", "planned_departure", "actual_departure",
+    "planned_arrival", "actual_arrival", "delay_minutes", "schedule_deviation_minutes",
+    "arrival_delay_minutes", "arrival_schedule_deviation_minutes", "arrival_observed", "arrival_info_missing",
+    "departure_reason", "arrival_reason",
+    "canceled_departure", "canceled_arrival", "canceled",
+)
+
+
+UPSERT_CAR_OBSERVATIONS_SQL = """
+INSERT INTO car_observations (
+    observation_ts, service_date, route_label, from_name, to_name,
+    target_departure_time, duration_minutes, distance_km
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(service_date, route_label, target_departure_time)
+DO UPDATE SET
+    observation_ts=excluded.observation_ts,
+    from_name=excluded.from_name,
+    to_name=excluded.to_name,
+    duration_minutes=excluded.duration_minutes,
+    distance_km=excluded.distance_km
+"""
+
+_CAR_OBSERVATION_PARAMS = attrgetter(
+    "observation_ts", "service_date", "route_label", "from_name", "to_name",
+    "target_departure_time", "duration_minutes", "distance_km",
+)
+
+
+# Per-connection tuning; the journal mode itself is persistent and set once in initialize().
+CONNECTION_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+PRAGMA mmap_size=268435456;
+"""
+
+
+UPSERT_CHUNK_SIZE = 10_000
+
+# Timestamps are stored as ISO-8601 text; converting in the adapter keeps the row tuples plain.
+sqlite3.register_adapter(datetime, datetime.isoformat)
+sqlite3.register_adapter(date, date.isoformat)
+
+_T = TypeVar("_T")
+
+
 REQUIRED_COLUMNS: dict[str, str] = {
     "train_name": "TEXT",
     "arrival_delay_minutes": "INTEGER NOT NULL DEFAULT 0",
@@ -63,16 +168,66 @@ REQUIRED_COLUMNS: dict[str, str] = {
 }
 
 
+def _chunks(rows: list[_T], size: int) -> Iterator[list[_T]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+@contextmanager
+def _immediate_transaction(con: sqlite3.Connection) -> Iterator[None]:
+    # Take the write lock up front and commit each batch exactly once.
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
+
+
 class ObservationStore:
     def __init__(self, db_path: str) -> None:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._con: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: write batches manage their own transactions.
+        con = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        con.executescript(CONNECTION_PRAGMAS)
+        return con
+
+    def _connection(self) -> sqlite3.Connection:
+        # One long-lived connection keeps pragmas applied and prepared statements cached.
+        if self._con is None:
+            self._con = self._connect()
+            atexit.register(self.close)
+        return self._con
+
+    def close(self) -> None:
+        # Checkpoint explicitly: closing only checkpoints the WAL when this is the last
+        # connection, and a running dashboard keeps its own reader open. TRUNCATE leaves the
+        # main database file complete on its own for backups and commits.
+        with self._lock:
+            if self._con is not None:
+                # Refreshes planner statistics only where they have drifted; usually a no-op.
+                self._con.execute("PRAGMA optimize")
+                self._con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._con.close()
+                self._con = None
+            atexit.unregister(self.close)
 
     def initialize(self) -> None:
-        with sqlite3.connect(self.db_path) as con:
+        with self._lock:
+            con = self._connection()
+            # WAL appends instead of rewriting pages; close() checkpoints it back into the main
+            # file, so the committed database stays self-contained.
+            if con.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+                con.execute("PRAGMA journal_mode=WAL")
             con.executescript(SCHEMA)
             self._migrate_existing_table(con)
-            con.commit()
+            con.execute("PRAGMA optimize")
 
     @staticmethod
     def _migrate_existing_table(con: sqlite3.Connection) -> None:
@@ -88,129 +243,24 @@ class ObservationStore:
         if not rows:
             return 0
 
-        with sqlite3.connect(self.db_path) as con:
+        with self._lock:
+            con = self._connection()
             cursor = con.cursor()
-            cursor.executemany(
-                """
-                INSERT INTO observations (
-                    observation_ts, service_date, train_id, train_name, line, route_label,
-                    source_station, target_station, planned_departure, actual_departure,
-                    planned_arrival, actual_arrival, delay_minutes, schedule_deviation_minutes,
-                    arrival_delay_minutes, arrival_schedule_deviation_minutes, arrival_observed, arrival_info_missing,
-                    departure_reason, arrival_reason,
-                    canceled_departure, canceled_arrival, canceled
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(service_date, train_id, route_label)
-                DO UPDATE SET
-                    observation_ts=excluded.observation_ts,
-                    train_name=excluded.train_name,
-                    line=excluded.line,
-                    source_station=excluded.source_station,
-                    target_station=excluded.target_station,
-                    planned_departure=excluded.planned_departure,
-                    actual_departure=excluded.actual_departure,
-                    planned_arrival=excluded.planned_arrival,
-                    actual_arrival=CASE
-                        WHEN excluded.arrival_observed = 1 THEN excluded.actual_arrival
-                        ELSE observations.actual_arrival
-                    END,
-                    delay_minutes=excluded.delay_minutes,
-                    schedule_deviation_minutes=excluded.schedule_deviation_minutes,
-                    arrival_delay_minutes=CASE
-                        WHEN excluded.arrival_observed = 1 THEN excluded.arrival_delay_minutes
-                        ELSE observations.arrival_delay_minutes
-                    END,
-                    arrival_schedule_deviation_minutes=CASE
-                        WHEN excluded.arrival_observed = 1 THEN excluded.arrival_schedule_deviation_minutes
-                        ELSE observations.arrival_schedule_deviation_minutes
-                    END,
-                    arrival_observed=CASE
-                        WHEN observations.arrival_observed = 1 OR excluded.arrival_observed = 1 THEN 1
-                        ELSE 0
-                    END,
-                    arrival_info_missing=CASE
-                        WHEN observations.arrival_observed = 1 OR excluded.arrival_observed = 1 THEN 0
-                        WHEN observations.arrival_info_missing = 1 OR excluded.arrival_info_missing = 1 THEN 1
-                        ELSE 0
-                    END,
-                    departure_reason=excluded.departure_reason,
-                    arrival_reason=CASE
-                        WHEN excluded.arrival_observed = 1 THEN excluded.arrival_reason
-                        WHEN observations.arrival_reason IS NOT NULL AND observations.arrival_reason != '' THEN observations.arrival_reason
-                        ELSE excluded.arrival_reason
-                    END,
-                    canceled_departure=excluded.canceled_departure,
-                    canceled_arrival=CASE
-                        WHEN excluded.arrival_observed = 1 THEN excluded.canceled_arrival
-                        ELSE observations.canceled_arrival
-                    END,
-                    canceled=excluded.canceled
-                """,
-                [
-                    (
-                        row.observation_ts.isoformat(),
-                        row.service_date,
-                        row.train_id,
-                        row.train_name,
-                        row.line,
-                        row.route_label,
-                        row.source_station,
-                        row.target_station,
-                        row.planned_departure.isoformat(),
-                        row.actual_departure.isoformat() if row.actual_departure else None,
-                        row.planned_arrival.isoformat() if row.planned_arrival else None,
-                        row.actual_arrival.isoformat() if row.actual_arrival else None,
-                        row.delay_minutes,
-                        row.schedule_deviation_minutes,
-                        row.arrival_delay_minutes,
-                        row.arrival_schedule_deviation_minutes,
-                        int(row.arrival_observed),
-                        int(row.arrival_info_missing),
-                        row.departure_reason,
-                        row.arrival_reason,
-                        int(row.canceled_departure),
-                        int(row.canceled_arrival),
-                        int(row.canceled),
-                    )
-                    for row in rows
-                ],
-            )
-            con.commit()
+            for chunk in _chunks(rows, UPSERT_CHUNK_SIZE):
+                with _immediate_transaction(con):
+                    # Lazily built: sqlite3 binds one row at a time; bools bind as 0/1 and
+                    # datetimes go through the registered ISO adapter.
+                    cursor.executemany(UPSERT_OBSERVATIONS_SQL, map(_OBSERVATION_PARAMS, chunk))
         return len(rows)
 
     def upsert_car_many(self, rows: list[CarObservation]) -> int:
         if not rows:
             return 0
 
-        with sqlite3.connect(self.db_path) as con:
+        with self._lock:
+            con = self._connection()
             cursor = con.cursor()
-            cursor.executemany(
-                """
-                INSERT INTO car_observations (
-                    observation_ts, service_date, route_label, from_name, to_name,
-                    target_departure_time, duration_minutes, distance_km
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(service_date, route_label, target_departure_time)
-                DO UPDATE SET
-                    observation_ts=excluded.observation_ts,
-                    from_name=excluded.from_name,
-                    to_name=excluded.to_name,
-                    duration_minutes=excluded.duration_minutes,
-                    distance_km=excluded.distance_km
-                """,
-                [
-                    (
-                        row.observation_ts.isoformat(),
-                        row.service_date,
-                        row.route_label,
-                        row.from_name,
-                        row.to_name,
-                        row.target_departure_time,
-                        row.duration_minutes,
-                        row.distance_km,
-                    )
-                    for row in rows
-                ],
-            )
-            con.commit()
+            for chunk in _chunks(rows, UPSERT_CHUNK_SIZE):
+                with _immediate_transaction(con):
+                    cursor.executemany(UPSERT_CAR_OBSERVATIONS_SQL, map(_CAR_OBSERVATION_PARAMS, chunk))
         return len(rows)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import re
+
 from .models import Study
 
 ALLOWED_PUBLICATION_TYPES = {
@@ -35,15 +37,19 @@ HIGH_RELEVANCE_TOPICS = {
     "time to treatment",
 }
 
+# One alternation per keyword set so each check is a single C-level scan of the text.
+_EXCLUDED_RE = re.compile("|".join(re.escape(term) for term in sorted(EXCLUDED_KEYWORDS)))
+_HIGH_RELEVANCE_RE = re.compile("|".join(re.escape(topic) for topic in sorted(HIGH_RELEVANCE_TOPICS)))
+
 
 def passes_clinical_scope(study: Study) -> tuple[bool, list[str]]:
     notes: list[str] = []
-    merged = f"{study.title} {study.abstract}".lower()
+    merged = study.merged_lower
 
-    if any(term in merged for term in EXCLUDED_KEYWORDS):
+    if _EXCLUDED_RE.search(merged):
         return False, ["Ausgeschlossen: präklinisch/seltene oder nicht-praktikable Evidenz."]
 
-    if not any(topic in merged for topic in HIGH_RELEVANCE_TOPICS):
+    if not _HIGH_RELEVANCE_RE.search(merged):
         return False, ["Ausgeschlossen: nicht klarer Stroke/Neuro-Notfall-Fokus."]
 
     pub_types = set(study.publication_types)
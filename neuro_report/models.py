@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import date
+from functools import cached_property
 
 
 @dataclass
@@ -21,6 +22,20 @@ class Study:
     key_statistics: list[str] = field(default_factory=list)
     context_statement: str = ""
 
+    # Lowercased text shared by filtering, scoring and summarizing; title and abstract are
+    # fixed after parsing, so each is lowercased once.
+    @cached_property
+    def abstract_lower(self) -> str:
+        return self.abstract.lower()
+
+    @cached_property
+    def merged_lower(self) -> str:
+        return f"{self.title.lower()} {self.abstract_lower}"
+
+    @cached_property
+    def publication_types_lower(self) -> frozenset[str]:
+        return frozenset(p.lower() for p in self.publication_types)
+
     @property
     def countries_display(self) -> str:
         if not self.country_hints:
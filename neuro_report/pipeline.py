@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import argparse
-import json
-from dataclasses import asdict
+import heapq
+from dataclasses import fields
 from datetime import date
 from pathlib import Path
 
+import orjson
+
 from .config import PipelineConfig, default_date_range
 from .filters import passes_clinical_scope
 from .models import Study
@@ -13,6 +15,9 @@ from .pubmed_client import PubMedClient
 from .report_builder import build_pdf_report
 from .scoring import score_study
 
+# Export keys in dataclass field order, as asdict() produced them.
+_STUDY_FIELDS = tuple(f.name for f in fields(Study))
+
 
 def run_pipeline(config: PipelineConfig, start_date: date | None = None, end_date: date | None = None) -> tuple[Path, Path, list[Study]]:
     range_start, range_end = (start_date, end_date) if start_date and end_date else default_date_range()
@@ -29,7 +34,7 @@ def run_pipeline(config: PipelineConfig, start_date: date | None = None, end_dat
         study.clinical_relevance_notes.extend(notes)
         selected.append(score_study(study))
 
-    top_studies = sorted(selected, key=lambda s: s.score, reverse=True)[: config.top_n]
+    top_studies = heapq.nlargest(config.top_n, selected, key=lambda s: s.score)
 
     stamp = date.today().isoformat()
     report_dir = config.output_dir
@@ -47,7 +52,7 @@ def run_pipeline(config: PipelineConfig, start_date: date | None = None, end_dat
 def run_demo_pipeline(config: PipelineConfig, start_date: date | None = None, end_date: date | None = None) -> tuple[Path, Path, list[Study]]:
     range_start, range_end = (start_date, end_date) if start_date and end_date else default_date_range()
     demo_studies = _demo_studies()
-    top_studies = sorted([score_study(s) for s in demo_studies], key=lambda s: s.score, reverse=True)[: config.top_n]
+    top_studies = heapq.nlargest(config.top_n, [score_study(s) for s in demo_studies], key=lambda s: s.score)
 
     stamp = date.today().isoformat()
     report_dir = config.output_dir
@@ -60,14 +65,17 @@ def run_demo_pipeline(config: PipelineConfig, start_date: date | None = None, en
     return pdf_path, json_path, top_studies
 
 
+def _export_row(study: Study) -> dict:
+    # Shallow row: the serializer only reads the nested lists/dicts, so asdict()'s deep copy is unnecessary.
+    row = {name: getattr(study, name) for name in _STUDY_FIELDS}
+    if study.publication_date:
+        row["publication_date"] = study.publication_date.isoformat()
+    return row
+
+
 def _write_json_export(studies: list[Study], path: Path) -> None:
-    payload = []
-    for study in studies:
-        row = asdict(study)
-        if study.publication_date:
-            row["publication_date"] = study.publication_date.isoformat()
-        payload.append(row)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    payload = [_export_row(study) for study in studies]
+    path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
 
 
 def parse_args() -> argparse.Namespace:
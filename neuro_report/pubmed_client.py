@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import io
 import re
-import xml.etree.ElementTree as ET
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from xml.etree import ElementTree as ET
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from .models import Study
 
 EUTILS_BASE = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+EFETCH_BATCH_SIZE = 100
+# NCBI allows three E-utilities requests per second without an API key.
+EUTILS_WORKERS = 3
+EUTILS_MIN_INTERVAL_SECONDS = 1 / 3
 
 COUNTRY_MARKERS = {
     "germany": "Deutschland",
@@ -36,59 +46,105 @@ COUNTRY_MARKERS = {
 }
 
 
+_STROKE_TERMS = "(stroke OR ischemic stroke OR intracerebral hemorrhage OR subarachnoid hemorrhage OR thrombectomy OR thrombolysis)"
+_EMERGENCY_TERMS = "(emergency OR acute OR critical care OR neurocritical care OR emergency department)"
+_CLINICAL_TERMS = "(randomized OR trial OR cohort OR registry OR meta-analysis OR guideline)"
+_EXCLUDE_TERMS = "NOT (animals[MeSH Terms] NOT humans[MeSH Terms]) NOT (mouse OR mice OR rat OR in vitro OR preclinical)"
+_PUBMED_QUERY = f"{_STROKE_TERMS} AND {_EMERGENCY_TERMS} AND {_CLINICAL_TERMS} {_EXCLUDE_TERMS}"
+
+# Affiliations without a known marker often end in a plain country name.
+_TAIL_RE = re.compile(r"[A-Za-z .-]{3,}")
+
+
+# Every marker occurrence in one pass. The zero-width lookahead reports overlapping markers
+# too, like the per-marker `in` checks did.
+_COUNTRY_RE = re.compile(
+    "(?=(" + "|".join(re.escape(m) for m in sorted(COUNTRY_MARKERS, key=len, reverse=True)) + "))"
+)
+
+
+def _country_hits(low: str) -> set[str]:
+    return {COUNTRY_MARKERS[match.group(1)] for match in _COUNTRY_RE.finditer(low)}
+
+
 class PubMedClient:
     def __init__(self, email: str, timeout_seconds: int = 30) -> None:
         self.email = email
         self.timeout_seconds = timeout_seconds
-
-    def search_pmids(self, start_date: date, end_date: date, max_results: int) -> list[str]:
-        query = self._build_query()
-        params = {
+        # Keep-alive across the esearch call and all efetch batches.
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=EUTILS_WORKERS))
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
+        # Only the date window and result limit vary between searches.
+        self._search_params = {
             "db": "pubmed",
-            "term": query,
-            "retmax": str(max_results),
+            "term": _PUBMED_QUERY,
             "retmode": "json",
             "sort": "pub date",
-            "mindate": start_date.isoformat(),
-            "maxdate": end_date.isoformat(),
             "datetype": "pdat",
-            "email": self.email,
+            "email": email,
         }
-        response = requests.get(f"{EUTILS_BASE}/esearch.fcgi", params=params, timeout=self.timeout_seconds)
+
+    def _get(self, endpoint: str, params: dict[str, str]) -> requests.Response:
+        # Hand out request slots spaced by the NCBI interval; waiting happens outside the lock.
+        with self._throttle_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + EUTILS_MIN_INTERVAL_SECONDS
+        if start_at > now:
+            time.sleep(start_at - now)
+        response = self._session.get(f"{EUTILS_BASE}/{endpoint}", params=params, timeout=self.timeout_seconds)
         response.raise_for_status()
-        payload = response.json()
+        return response
+
+    def search_pmids(self, start_date: date, end_date: date, max_results: int) -> list[str]:
+        params = dict(
+            self._search_params,
+            retmax=str(max_results),
+            mindate=start_date.isoformat(),
+            maxdate=end_date.isoformat(),
+        )
+        payload = self._get("esearch.fcgi", params).json()
         return payload.get("esearchresult", {}).get("idlist", [])
 
     def fetch_studies(self, pmids: list[str]) -> list[Study]:
         if not pmids:
             return []
-        studies: list[Study] = []
-        chunk_size = 100
-        for i in range(0, len(pmids), chunk_size):
-            batch = pmids[i : i + chunk_size]
-            params = {
+        params_list = [
+            {
                 "db": "pubmed",
-                "id": ",".join(batch),
+                "id": ",".join(pmids[i : i + EFETCH_BATCH_SIZE]),
                 "retmode": "xml",
                 "email": self.email,
             }
-            response = requests.get(f"{EUTILS_BASE}/efetch.fcgi", params=params, timeout=self.timeout_seconds)
-            response.raise_for_status()
-            studies.extend(self._parse_efetch_xml(response.text))
+            for i in range(0, len(pmids), EFETCH_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=min(EUTILS_WORKERS, len(params_list))) as pool:
+            responses = list(pool.map(lambda params: self._get("efetch.fcgi", params), params_list))
+
+        studies: list[Study] = []
+        for response in responses:
+            studies.extend(self._parse_efetch_xml(response.content))
         return studies
 
     @staticmethod
-    def _build_query() -> str:
-        stroke_terms = "(stroke OR ischemic stroke OR intracerebral hemorrhage OR subarachnoid hemorrhage OR thrombectomy OR thrombolysis)"
-        emergency_terms = "(emergency OR acute OR critical care OR neurocritical care OR emergency department)"
-        clinical_terms = "(randomized OR trial OR cohort OR registry OR meta-analysis OR guideline)"
-        exclude_terms = "NOT (animals[MeSH Terms] NOT humans[MeSH Terms]) NOT (mouse OR mice OR rat OR in vitro OR preclinical)"
-        return f"{stroke_terms} AND {emergency_terms} AND {clinical_terms} {exclude_terms}"
-
-    def _parse_efetch_xml(self, xml_text: str) -> list[Study]:
-        root = ET.fromstring(xml_text)
+    def _iter_articles(xml_payload: bytes | str) -> Iterator[ET.Element]:
+        # Streams <PubmedArticle> elements instead of building the whole efetch tree. Once the
+        # caller has moved on, processed articles are dropped from the root so they don't pile up.
+        source = io.BytesIO(xml_payload if isinstance(xml_payload, bytes) else xml_payload.encode("utf-8"))
+        root = None
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event != "end" or elem.tag != "PubmedArticle":
+                continue
+            yield elem
+            root.clear()
+
+    def _parse_efetch_xml(self, xml_payload: bytes | str) -> list[Study]:
         studies: list[Study] = []
-        for article in root.findall(".//PubmedArticle"):
+        for article in self._iter_articles(xml_payload):
             pmid = self._text(article.find(".//PMID"))
             title = self._text(article.find(".//ArticleTitle"))
             journal = self._text(article.find(".//Journal/Title"))
@@ -181,14 +237,10 @@ class PubMedClient:
     def _extract_countries(affiliations: list[str]) -> list[str]:
         hits: set[str] = set()
         for aff in affiliations:
-            low = aff.lower()
-            matched = False
-            for marker, normalized in COUNTRY_MARKERS.items():
-                if marker in low:
-                    hits.add(normalized)
-                    matched = True
+            matched = _country_hits(aff.lower())
+            hits.update(matched)
             if not matched:
                 tail = aff.split(",")[-1].strip()
-                if re.fullmatch(r"[A-Za-z .-]{3,}", tail):
+                if _TAIL_RE.fullmatch(tail):
                     hits.add(tail)
         return sorted(hits)
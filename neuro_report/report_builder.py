@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import io
+import zlib
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
 
 from .models import Study
@@ -13,6 +17,11 @@ LEFT_MARGIN = 44
 RIGHT_MARGIN = 44
 TOP_MARGIN = 800
 BOTTOM_MARGIN = 48
+# Page content streams are Flate-compressed; text-only streams shrink several-fold.
+PDF_STREAM_COMPRESSION_LEVEL = 6
+
+# Backslash and parentheses must be escaped inside PDF string literals; one translate pass.
+_PDF_ESCAPE_TABLE = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)"})
 
 
 @dataclass
@@ -36,6 +45,12 @@ STYLE_MAP = {
     "divider": {"font": "F1", "size": 10, "leading": 10},
 }
 
+# STYLE_MAP flattened once at import so the layout and render loops do single dict lookups.
+_LEADING = {style: int(cfg["leading"]) for style, cfg in STYLE_MAP.items()}
+_CHAR_WIDTH = {style: max(4.6, cfg["size"] * 0.53) for style, cfg in STYLE_MAP.items()}
+# "BT" plus the font selection for each style.
+_TEXT_PREFIX = {style: f"BT\n/{cfg['font']} {cfg['size']} Tf\n".encode("ascii") for style, cfg in STYLE_MAP.items()}
+
 
 def build_pdf_report(
     studies: list[Study],
@@ -55,6 +70,8 @@ def build_pdf_report(
 
 def _build_newsletter_lines(studies: list[Study], start_date: date, end_date: date, generated_on: date) -> list[RenderLine]:
     lines: list[RenderLine] = []
+    # Summaries feed both the highlights and the per-study sections; build each only once.
+    summaries = [summarize_study(study) for study in studies]
     _add_wrapped(lines, "Neurologie Clinical Update", "title")
     _add_wrapped(lines, "Monatsnewsletter: Schlaganfall und Neuro-Notfallmedizin", "section")
     _add_wrapped(
@@ -77,8 +94,7 @@ def _build_newsletter_lines(studies: list[Study], start_date: date, end_date: da
     if not studies:
         _add_wrapped(lines, "Keine geeigneten Studien im Zeitraum gefunden.", "body")
     else:
-        for rank, study in enumerate(studies[:5], start=1):
-            summary = summarize_study(study)
+        for rank, (study, summary) in enumerate(zip(studies[:5], summaries), start=1):
             _add_wrapped(
                 lines,
                 f"{rank}. {study.title}",
@@ -104,8 +120,7 @@ def _build_newsletter_lines(studies: list[Study], start_date: date, end_date: da
     lines.append(RenderLine("", "spacer"))
     lines.append(RenderLine("", "divider"))
 
-    for idx, study in enumerate(studies, start=1):
-        summary = summarize_study(study)
+    for idx, (study, summary) in enumerate(zip(studies, summaries), start=1):
         _add_wrapped(lines, f"Studie {idx}: {study.title}", "study_header")
 
         meta = (
@@ -176,11 +191,11 @@ def _add_wrapped(lines: list[RenderLine], text: str, style: str, indent: int = 0
         lines.append(RenderLine(chunk, style, indent=indent))
 
 
+# Only a handful of (style, indent) pairs exist; the width math runs once per pair.
+@lru_cache(maxsize=64)
 def _max_chars_for_style(style: str, indent: int) -> int:
-    cfg = STYLE_MAP.get(style, STYLE_MAP["body"])
     text_width = PAGE_WIDTH - LEFT_MARGIN - RIGHT_MARGIN - indent * 18
-    approx_char_width = max(4.6, cfg["size"] * 0.53)
-    return max(28, int(text_width / approx_char_width))
+    return max(28, int(text_width / _CHAR_WIDTH.get(style, _CHAR_WIDTH["body"])))
 
 
 def _wrap(text: str, width: int) -> list[str]:
@@ -188,125 +203,151 @@ def _wrap(text: str, width: int) -> list[str]:
     if not words:
         return [""]
 
+    # Collect words per line and join once on flush instead of re-concatenating per word.
     result: list[str] = []
-    current = words[0]
+    buf = [words[0]]
+    used = len(words[0])
     for word in words[1:]:
-        if len(current) + 1 + len(word) <= width:
-            current = f"{current} {word}"
+        needed = used + 1 + len(word)
+        if needed <= width:
+            buf.append(word)
+            used = needed
         else:
-            result.append(current)
-            current = word
-    result.append(current)
+            result.append(" ".join(buf))
+            buf = [word]
+            used = len(word)
+    result.append(" ".join(buf))
     return result
 
 
-def _line_height(line: RenderLine) -> int:
-    return int(STYLE_MAP.get(line.style, STYLE_MAP["body"])["leading"])
-
-
 def _paginate_lines(lines: list[RenderLine]) -> list[list[RenderLine]]:
     pages: list[list[RenderLine]] = []
-    current: list[RenderLine] = []
-    current_height = 0
     max_height = TOP_MARGIN - BOTTOM_MARGIN
+    body_leading = _LEADING["body"]
+    # Heights looked up in one pass; the break loop is then plain integer accumulation and
+    # each page is a single slice of `lines`.
+    heights = [_LEADING.get(line.style, body_leading) for line in lines]
 
-    for line in lines:
-        needed = _line_height(line)
-        if current and current_height + needed > max_height:
-            pages.append(current)
-            current = []
+    page_start = 0
+    current_height = 0
+    for idx, needed in enumerate(heights):
+        if idx > page_start and current_height + needed > max_height:
+            pages.append(lines[page_start:idx])
+            page_start = idx
             current_height = 0
-        current.append(line)
         current_height += needed
 
-    if current:
-        pages.append(current)
+    if page_start < len(lines):
+        pages.append(lines[page_start:])
     return pages or [[RenderLine("Keine Inhalte", "body")]]
 
 
 def _escape_pdf_text(value: str) -> str:
-    return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return value.translate(_PDF_ESCAPE_TABLE)
+
+
+# Per-style line emitters with the style's operators and leading bound at import. Each
+# appends its line to the page buffer and returns the next baseline.
+_PageEmitter = Callable[[bytearray, RenderLine, int], int]
+
+
+def _text_emitter(prefix: bytes, leading: int) -> _PageEmitter:
+    def emit(buf: bytearray, line: RenderLine, y: int) -> int:
+        buf += prefix
+        buf += b"%d %d Td\n(" % (LEFT_MARGIN + line.indent * 18, y)
+        buf += _escape_pdf_text(line.text).encode("latin-1", errors="replace")
+        buf += b") Tj\nET\n"
+        return y - leading
+
+    return emit
+
+
+def _spacer_emitter(leading: int) -> _PageEmitter:
+    def emit(buf: bytearray, line: RenderLine, y: int) -> int:
+        return y - leading
+
+    return emit
+
+
+def _divider_emitter(leading: int) -> _PageEmitter:
+    def emit(buf: bytearray, line: RenderLine, y: int) -> int:
+        y -= 5
+        buf += b"0.7 w %d %d m %d %d l S\n" % (LEFT_MARGIN, y, PAGE_WIDTH - RIGHT_MARGIN, y)
+        return y - (leading - 5)
+
+    return emit
+
+
+_EMITTERS: dict[str, _PageEmitter] = {
+    style: (
+        _divider_emitter(_LEADING[style])
+        if style == "divider"
+        else _spacer_emitter(_LEADING[style])
+        if style == "spacer"
+        else _text_emitter(_TEXT_PREFIX[style], _LEADING[style])
+    )
+    for style in STYLE_MAP
+}
 
 
 def _render_page_stream(page_lines: list[RenderLine], page_number: int, total_pages: int) -> bytes:
     y = TOP_MARGIN
-    cmds: list[str] = []
-
+    # Operators are written straight into one buffer; only the text itself needs encoding.
+    buf = bytearray()
+    body = _EMITTERS["body"]
     for line in page_lines:
-        cfg = STYLE_MAP.get(line.style, STYLE_MAP["body"])
-
-        if line.style == "divider":
-            y -= 5
-            cmds.append(f"0.7 w {LEFT_MARGIN} {y} m {PAGE_WIDTH - RIGHT_MARGIN} {y} l S")
-            y -= cfg["leading"] - 5
-            continue
-
-        if line.style == "spacer":
-            y -= cfg["leading"]
-            continue
-
-        x = LEFT_MARGIN + line.indent * 18
-        safe = _escape_pdf_text(line.text)
-        cmds.append("BT")
-        cmds.append(f"/{cfg['font']} {cfg['size']} Tf")
-        cmds.append(f"{x} {y} Td")
-        cmds.append(f"({safe}) Tj")
-        cmds.append("ET")
-        y -= cfg["leading"]
+        y = _EMITTERS.get(line.style, body)(buf, line, y)
 
     footer = _escape_pdf_text(f"Seite {page_number}/{total_pages}")
-    cmds.extend(["BT", "/F1 9 Tf", f"{PAGE_WIDTH - RIGHT_MARGIN - 60} {BOTTOM_MARGIN - 10} Td", f"({footer}) Tj", "ET"])
-
-    return "\n".join(cmds).encode("latin-1", errors="replace")
+    buf += b"BT\n/F1 9 Tf\n%d %d Td\n(" % (PAGE_WIDTH - RIGHT_MARGIN - 60, BOTTOM_MARGIN - 10)
+    buf += footer.encode("latin-1", errors="replace")
+    buf += b") Tj\nET"
+    return bytes(buf)
 
 
 def _render_pdf(pages: list[list[RenderLine]]) -> bytes:
-    objects: list[bytes] = []
-
-    # 1 catalog, 2 pages root, 3 regular font, 4 bold font, 5 oblique font
-    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
-    objects.append(b"placeholder-pages")
-    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
-    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
-    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Oblique >>")
-
-    page_object_ids: list[int] = []
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = [0]
 
-    for idx, page_lines in enumerate(pages, start=1):
-        stream = _render_page_stream(page_lines, idx, len(pages))
-        content_obj = f"<< /Length {len(stream)} >>\nstream\n".encode("ascii") + stream + b"\nendstream"
-        objects.append(content_obj)
-        content_id = len(objects)
-
-        page_obj = (
-            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
-            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R /F3 5 0 R >> >> /Contents {content_id} 0 R >>"
-        ).encode("ascii")
-        objects.append(page_obj)
-        page_object_ids.append(len(objects))
+    def write_object(obj: bytes) -> None:
+        offsets.append(out.tell())
+        out.write(f"{len(offsets) - 1} 0 obj\n".encode("ascii"))
+        out.write(obj)
+        out.write(b"\nendobj\n")
 
+    # 1 catalog, 2 pages root, 3 regular font, 4 bold font, 5 oblique font, then a
+    # (content stream, page) pair per page. The ids are fixed up front, so every object
+    # is written as soon as it is built and no page stream outlives its page.
+    page_object_ids = [7 + 2 * idx for idx in range(len(pages))]
     kids = " ".join([f"{pid} 0 R" for pid in page_object_ids])
-    objects[1] = f"<< /Type /Pages /Count {len(page_object_ids)} /Kids [{kids}] >>".encode("ascii")
+    write_object(b"<< /Type /Catalog /Pages 2 0 R >>")
+    write_object(f"<< /Type /Pages /Count {len(page_object_ids)} /Kids [{kids}] >>".encode("ascii"))
+    write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+    write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Oblique >>")
 
-    pdf = bytearray()
-    pdf.extend(b"%PDF-1.4\n")
+    for idx, page_lines in enumerate(pages, start=1):
+        stream = zlib.compress(_render_page_stream(page_lines, idx, len(pages)), PDF_STREAM_COMPRESSION_LEVEL)
+        write_object(f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("ascii") + stream + b"\nendstream")
+        content_id = len(offsets) - 1
+        write_object(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R /F2 4 0 R /F3 5 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode("ascii")
+        )
 
-    offsets = [0]
-    for obj_id, obj in enumerate(objects, start=1):
-        offsets.append(len(pdf))
-        pdf.extend(f"{obj_id} 0 obj\n".encode("ascii"))
-        pdf.extend(obj)
-        pdf.extend(b"\nendobj\n")
-
-    xref_pos = len(pdf)
-    pdf.extend(f"xref\n0 {len(objects) + 1}\n".encode("ascii"))
-    pdf.extend(b"0000000000 65535 f \n")
-    for idx in range(1, len(objects) + 1):
-        pdf.extend(f"{offsets[idx]:010d} 00000 n \n".encode("ascii"))
+    object_count = len(offsets) - 1
+    xref_pos = out.tell()
+    out.write(f"xref\n0 {object_count + 1}\n".encode("ascii"))
+    out.write(b"0000000000 65535 f \n")
+    for offset in offsets[1:]:
+        out.write(f"{offset:010d} 00000 n \n".encode("ascii"))
 
     trailer = (
-        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"trailer\n<< /Size {object_count + 1} /Root 1 0 R >>\n"
         f"startxref\n{xref_pos}\n%%EOF"
     )
-    pdf.extend(trailer.encode("ascii"))
-    return bytes(pdf)
+    out.write(trailer.encode("ascii"))
+    return out.getvalue()
@@ -4,35 +4,94 @@ import re
 
 from .models import Study
 
+# `merged` is already lowercased, so sample-size patterns need no IGNORECASE.
+_SAMPLE_SIZE_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        r"\bn\s*[=:]\s*(\d{2,6})\b",
+        r"\bsample size\s*[=:]?\s*(\d{2,6})\b",
+        r"\b(\d{2,6})\s+patients?\b",
+        r"\b(\d{2,6})\s+participants?\b",
+    )
+)
+
+_STAT_PATTERNS = (
+    r"\bHR\s*[=:]?\s*\d+(?:\.\d+)?(?:\s*\([^)]*\))?",
+    r"\bOR\s*[=:]?\s*\d+(?:\.\d+)?(?:\s*\([^)]*\))?",
+    r"\bRR\s*[=:]?\s*\d+(?:\.\d+)?(?:\s*\([^)]*\))?",
+    r"\bp\s*[<=>]\s*0?\.\d+",
+    r"95%\s*CI\s*[=:]?\s*\(?\d+(?:\.\d+)?\s*[-,]\s*\d+(?:\.\d+)?\)?",
+    r"\bNNT\s*[=:]?\s*\d+(?:\.\d+)?",
+)
+# All statistic patterns in one scan. Each sits in its own group inside a zero-width
+# lookahead, so a CI nested in an HR/OR match is still found as its own statistic.
+# The patterns start with distinct characters (H, O, R, p, 9, N), so at most one group
+# matches per position; the leading class lets the engine skip every other position fast.
+_STATS_RE = re.compile("(?=[hoprn9])(?=" + "|".join(f"({pattern})" for pattern in _STAT_PATTERNS) + ")", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Keyword sets per scoring axis, matched against the lowercased title + abstract.
+_DESIGN_TERMS = frozenset({"cohort"})
+_HARD_ENDPOINT_TERMS = frozenset({"mortality", "functional outcome", "mrs", "disability", "readmission", "hemorrhage"})
+_GENERALIZABILITY_TERMS = frozenset({"multicenter", "multi-center", "registry", "international", "real-world"})
+_GUIDELINE_TERMS = frozenset({"guideline", "practice-changing", "standard of care"})
+_ACUTE_PATHWAY_TERMS = frozenset({"thrombectomy", "thrombolysis", "door-to-needle", "triage"})
+_REPERFUSION_TERMS = frozenset({"thrombectomy", "thrombolysis"})
+_HEMORRHAGE_TERMS = frozenset({"intracerebral hemorrhage", "subarachnoid"})
+_KEYWORD_TERMS = (
+    _DESIGN_TERMS
+    | _HARD_ENDPOINT_TERMS
+    | _GENERALIZABILITY_TERMS
+    | _GUIDELINE_TERMS
+    | _ACUTE_PATHWAY_TERMS
+    | _REPERFUSION_TERMS
+    | _HEMORRHAGE_TERMS
+)
+# Every keyword of every axis in one scan. The zero-width lookahead also reports terms
+# inside other terms ("hemorrhage" in "intracerebral hemorrhage"); no term is a prefix of
+# another, so each start position yields at most one term.
+_KEYWORD_RE = re.compile(
+    "(?=[" + "".join(sorted({term[0] for term in _KEYWORD_TERMS})) + "])"
+    "(?=(" + "|".join(re.escape(term) for term in sorted(_KEYWORD_TERMS)) + "))"
+)
+
+
+def _keyword_hits(merged: str) -> frozenset[str]:
+    return frozenset(match.group(1) for match in _KEYWORD_RE.finditer(merged))
+
 
 def score_study(study: Study) -> Study:
-    merged = f"{study.title} {study.abstract}".lower()
+    merged = study.merged_lower
+    # Extracted once: feeds both the effect-stats score and the report's key statistics.
+    key_statistics = extract_key_statistics(study.abstract)
+
+    # One keyword pass over the text; every axis below reads the same hit set.
+    hits = _keyword_hits(merged)
 
     breakdown = {
-        "design": _score_design(study.publication_types, merged),
+        "design": _score_design(study.publication_types_lower, hits),
         "sample_size": _score_sample_size(merged),
-        "hard_endpoints": _score_hard_endpoints(merged),
-        "effect_stats": _score_effect_stats(study.abstract),
-        "generalizability": _score_generalizability(merged),
-        "guideline_impact": _score_guideline_impact(merged),
+        "hard_endpoints": _score_hard_endpoints(hits),
+        "effect_stats": _score_effect_stats(key_statistics),
+        "generalizability": _score_generalizability(hits),
+        "guideline_impact": _score_guideline_impact(hits),
     }
 
     study.score_breakdown = breakdown
     study.score = sum(breakdown.values())
-    study.key_statistics = extract_key_statistics(study.abstract)
-    study.context_statement = build_context_statement(merged, study.score)
+    study.key_statistics = key_statistics
+    study.context_statement = _context_statement(hits, study.score)
     return study
 
 
-def _score_design(pub_types: list[str], merged: str) -> int:
-    types = {p.lower() for p in pub_types}
+def _score_design(types: frozenset[str], hits: frozenset[str]) -> int:
     if "randomized controlled trial" in types:
         return 25
     if "meta-analysis" in types or "systematic review" in types:
         return 22
     if "clinical trial" in types:
         return 20
-    if "observational study" in types or "cohort" in merged:
+    if "observational study" in types or hits & _DESIGN_TERMS:
         return 15
     return 8
 
@@ -53,27 +112,19 @@ def _score_sample_size(merged: str) -> int:
 
 
 def _extract_sample_size(merged: str) -> int | None:
-    patterns = [
-        r"\bn\s*[=:]\s*(\d{2,6})\b",
-        r"\bsample size\s*[=:]?\s*(\d{2,6})\b",
-        r"\b(\d{2,6})\s+patients?\b",
-        r"\b(\d{2,6})\s+participants?\b",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, merged)
+    for pattern in _SAMPLE_SIZE_PATTERNS:
+        match = pattern.search(merged)
         if match:
             return int(match.group(1))
     return None
 
 
-def _score_hard_endpoints(merged: str) -> int:
-    hard_terms = ["mortality", "functional outcome", "mRS", "disability", "readmission", "hemorrhage"]
-    found = sum(1 for t in hard_terms if t.lower() in merged)
+def _score_hard_endpoints(hits: frozenset[str]) -> int:
+    found = len(hits & _HARD_ENDPOINT_TERMS)
     return min(20, found * 5)
 
 
-def _score_effect_stats(abstract: str) -> int:
-    stats = extract_key_statistics(abstract)
+def _score_effect_stats(stats: list[str]) -> int:
     if len(stats) >= 4:
         return 15
     if len(stats) >= 2:
@@ -83,41 +134,48 @@ def _score_effect_stats(abstract: str) -> int:
     return 3
 
 
-def _score_generalizability(merged: str) -> int:
-    points = 0
-    for term in ["multicenter", "multi-center", "registry", "international", "real-world"]:
-        if term in merged:
-            points += 4
+def _score_generalizability(hits: frozenset[str]) -> int:
+    points = 4 * len(hits & _GENERALIZABILITY_TERMS)
     return min(15, points if points else 6)
 
 
-def _score_guideline_impact(merged: str) -> int:
-    if any(term in merged for term in ["guideline", "practice-changing", "standard of care"]):
+def _score_guideline_impact(hits: frozenset[str]) -> int:
+    if hits & _GUIDELINE_TERMS:
         return 10
-    if any(term in merged for term in ["thrombectomy", "thrombolysis", "door-to-needle", "triage"]):
+    if hits & _ACUTE_PATHWAY_TERMS:
         return 8
     return 5
 
 
 def extract_key_statistics(text: str) -> list[str]:
-    patterns = [
-        r"\bHR\s*[=:]?\s*\d+(?:\.\d+)?(?:\s*\([^)]*\))?",
-        r"\bOR\s*[=:]?\s*\d+(?:\.\d+)?(?:\s*\([^)]*\))?",
-        r"\bRR\s*[=:]?\s*\d+(?:\.\d+)?(?:\s*\([^)]*\))?",
-        r"\bp\s*[<=>]\s*0?\.\d+",
-        r"95%\s*CI\s*[=:]?\s*\(?\d+(?:\.\d+)?\s*[-,]\s*\d+(?:\.\d+)?\)?",
-        r"\bNNT\s*[=:]?\s*\d+(?:\.\d+)?",
-    ]
+    # Collected per pattern and resumed after each match, exactly as separate findall()
+    # passes per pattern would report them.
+    matches: list[list[str]] = [[] for _ in _STAT_PATTERNS]
+    resume_at = [0] * len(_STAT_PATTERNS)
+    for match in _STATS_RE.finditer(text):
+        group = match.lastindex
+        idx = group - 1
+        if match.start() < resume_at[idx]:
+            continue
+        resume_at[idx] = match.end(group)
+        matches[idx].append(match.group(group))
+
     found: list[str] = []
-    for pattern in patterns:
-        for match in re.findall(pattern, text, flags=re.IGNORECASE):
-            snippet = re.sub(r"\s+", " ", match).strip()
-            if snippet not in found:
+    seen: set[str] = set()
+    for pattern_matches in matches:
+        for raw in pattern_matches:
+            snippet = _WHITESPACE_RE.sub(" ", raw).strip()
+            if snippet not in seen:
+                seen.add(snippet)
                 found.append(snippet)
     return found[:8]
 
 
 def build_context_statement(merged_text: str, score: int) -> str:
+    return _context_statement(_keyword_hits(merged_text), score)
+
+
+def _context_statement(hits: frozenset[str], score: int) -> str:
     if score >= 80:
         impact = "Sehr hohe potenzielle Praxisrelevanz"
     elif score >= 65:
@@ -125,9 +183,9 @@ def build_context_statement(merged_text: str, score: int) -> str:
     else:
         impact = "Moderate potenzielle Praxisrelevanz"
 
-    if "thrombectomy" in merged_text or "thrombolysis" in merged_text:
+    if hits & _REPERFUSION_TERMS:
         context = "direkter Bezug zur akuten Reperfusionsstrategie"
-    elif "intracerebral hemorrhage" in merged_text or "subarachnoid" in merged_text:
+    elif hits & _HEMORRHAGE_TERMS:
         context = "relevant für neurovaskuläre Notfallpfade"
     else:
         context = "relevant für neuro-notfallmedizinische Prozessoptimierung"
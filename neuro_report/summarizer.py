@@ -6,23 +6,37 @@ from .models import Study
 
 SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
 
+# Each summary field takes the first abstract sentence containing one of its needles.
+FIELD_NEEDLES = {
+    "methods": ("random", "trial", "cohort", "registry", "meta-analysis", "systematic", "prospective", "retrospective", "multicenter"),
+    "population": ("n=", "patients", "participants", "included", "enrolled"),
+    "endpoint": ("primary endpoint", "primary outcome", "functional outcome", "mortality", "disability", "mrs"),
+    "result": ("reduced", "improved", "increase", "decrease", "significant", "superior", "noninferior"),
+    "limitations": ("limitation", "limitations", "caution", "interpreted with caution"),
+}
+# One alternation per field: a single regex scan per sentence instead of a substring test per needle.
+_FIELD_PATTERNS = {
+    field: re.compile("|".join(re.escape(needle) for needle in needles)) for field, needles in FIELD_NEEDLES.items()
+}
+
 
 def summarize_study(study: Study) -> dict[str, str | list[str]]:
     sentences = [s.strip() for s in SENTENCE_SPLIT.split(study.abstract) if s.strip()]
+    # Lowercasing never adds or removes the punctuation/whitespace the split keys on, so the
+    # lowercased abstract splits into the same sentences, already lowercased.
+    lowered = [s.strip() for s in SENTENCE_SPLIT.split(study.abstract_lower) if s.strip()]
 
-    methods = _first_match(
-        sentences,
-        ["random", "trial", "cohort", "registry", "meta-analysis", "systematic", "prospective", "retrospective", "multicenter"],
-    )
-    population = _first_match(sentences, ["n=", "patients", "participants", "included", "enrolled"]) 
-    endpoint = _first_match(sentences, ["primary endpoint", "primary outcome", "functional outcome", "mortality", "disability", "mrs"])
-    result = _first_match(sentences, ["reduced", "improved", "increase", "decrease", "significant", "superior", "noninferior"]) 
+    matches = _first_matches(sentences, lowered)
+    methods = matches.get("methods")
+    population = matches.get("population")
+    endpoint = matches.get("endpoint")
+    result = matches.get("result")
 
     stats = study.key_statistics or ["Keine klar extrahierbaren Kennzahlen im Abstract."]
 
     core_message = _build_core_message(study, result, endpoint)
     clinical_shift = _practice_shift(study, result)
-    limitations = _limitations(study, sentences)
+    limitations = _limitations(study, matches.get("limitations"))
 
     return {
         "core_message": core_message,
@@ -36,12 +50,18 @@ def summarize_study(study: Study) -> dict[str, str | list[str]]:
     }
 
 
-def _first_match(sentences: list[str], needles: list[str]) -> str | None:
-    for sentence in sentences:
-        low = sentence.lower()
-        if any(needle in low for needle in needles):
-            return sentence
-    return None
+def _first_matches(sentences: list[str], lowered: list[str]) -> dict[str, str]:
+    # One pass over the sentences until every field has its match.
+    found: dict[str, str] = {}
+    pending = dict(_FIELD_PATTERNS)
+    for sentence, low in zip(sentences, lowered):
+        for field, pattern in list(pending.items()):
+            if pattern.search(low):
+                found[field] = sentence
+                del pending[field]
+        if not pending:
+            break
+    return found
 
 
 def _build_core_message(study: Study, result: str | None, endpoint: str | None) -> str:
@@ -71,9 +91,8 @@ def _practice_shift(study: Study, result: str | None) -> str:
     return f"{base} {signal} {urgency}"
 
 
-def _limitations(study: Study, sentences: list[str]) -> str:
-    low_abstract = study.abstract.lower()
-    limitation_sentence = _first_match(sentences, ["limitation", "limitations", "caution", "interpreted with caution"])
+def _limitations(study: Study, limitation_sentence: str | None) -> str:
+    low_abstract = study.abstract_lower
     if limitation_sentence:
         return limitation_sentence
 
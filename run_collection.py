@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import ctypes
+import ctypes.util
 import os
 import shutil
-from datetime import datetime, timedelta
+import sys
+import time
+from datetime import date
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; backups then always use a plain copy.
+    fcntl = None
+
 from db_monitor.car_collector import collect_car_observations
 from db_monitor.collector import collect_observations
 from db_monitor.config import load_car_routes, load_route_windows, load_settings
 from db_monitor.storage import ObservationStore
 
+# Linux ioctl that shares the source file's extents with the destination (_IOW(0x94, 9, int)).
+FICLONE = 0x40049409
+
 
 def _bool_env(name: str, default: bool) -> bool:
     raw = os.getenv(name)
@@ -18,6 +30,29 @@ def _bool_env(name: str, default: bool) -> bool:
     return raw.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _clone_file(src: Path, dst: Path) -> bool:
+    # Copy-on-write clone (Btrfs/XFS reflink, APFS clonefile): no data is copied until either
+    # file changes. Returns False when the platform or filesystem cannot clone.
+    if sys.platform == "darwin":
+        libc_path = ctypes.util.find_library("c")
+        if libc_path is None:
+            return False
+        try:
+            clonefile = getattr(ctypes.CDLL(libc_path, use_errno=True), "clonefile", None)
+            # clonefile(2) exists from macOS 10.12 on.
+            return clonefile is not None and clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        except OSError:
+            return False
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as source, open(dst, "wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    except OSError:
+        return False
+    return True
+
+
 def _create_backup(database_path: str, backup_dir: str, retention_days: int) -> Path | None:
     db_path = Path(database_path)
     if not db_path.exists():
@@ -26,18 +61,27 @@ def _create_backup(database_path: str, backup_dir: str, retention_days: int) ->
     out_dir = Path(backup_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    stamp = datetime.now().strftime("%Y-%m-%d")
+    stamp = date.today().isoformat()
     backup_path = out_dir / f"{db_path.stem}_{stamp}{db_path.suffix}"
     if not backup_path.exists():
-        shutil.copy2(db_path, backup_path)
-
-    cutoff = datetime.now() - timedelta(days=retention_days)
-    for item in out_dir.glob(f"{db_path.stem}_*{db_path.suffix}"):
-        try:
-            if datetime.fromtimestamp(item.stat().st_mtime) < cutoff:
-                item.unlink()
-        except FileNotFoundError:
-            continue
+        if _clone_file(db_path, backup_path):
+            # Same timestamps as copy2, which the retention pruning below relies on.
+            shutil.copystat(db_path, backup_path)
+        else:
+            shutil.copy2(db_path, backup_path)
+
+    # One directory scan; scandir entries carry their stat result, compared as raw epoch seconds.
+    prefix = f"{db_path.stem}_"
+    cutoff_ts = time.time() - retention_days * 86400
+    with os.scandir(out_dir) as entries:
+        for entry in entries:
+            if not (entry.name.startswith(prefix) and entry.name.endswith(db_path.suffix)):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff_ts:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
 
     return backup_path
 
@@ -55,6 +99,8 @@ def main() -> None:
     car_rows = collect_car_observations(settings, load_car_routes())
     car_inserted = store.upsert_car_many(car_rows)
     print(f"Stored {car_inserted} car observations in {settings.database_path}")
+    # Flush the WAL into the database file before it is copied or committed.
+    store.close()
 
     backup_enabled = _bool_env("BACKUP_ENABLED", True)
     backup_dir = os.getenv("BACKUP_DIR", "data/backups")